@@ -1,8 +1,15 @@
+import os
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi.responses import ORJSONResponse
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from app.utils.rate_limit import limiter
+from app.services.dataforseo import close_http_session
+from app.services.content_generator import close_openai_client
+from app.services.stats_counter import start_stats_flusher, stop_stats_flusher
 
 # Import routers
 from app.routes.intake import router as intake_router
@@ -14,7 +21,7 @@ from app.routes.firestore import router as firestore_router
 from app.routes.admin import router as admin_router
 from app.routes.activity import router as activity_router
 from app.routes.content import router as content_router
-from app.routes.stats import router as stats_router
+from app.routes.stats import router as stats_router, start_stats_listener, stop_stats_listener
 from app.routes.rank_checker import router as rank_router
 from app.routes.payments import router as payments_router
 from app.routes.reviews import router as reviews_router
@@ -27,16 +34,36 @@ from app.routes.geo import router as geo_router
 
 
 # -------------------------------------------------
-# Rate Limiter Setup
+# Logging (set LOG_LEVEL=DEBUG to see per-request debug output)
 # -------------------------------------------------
-limiter = Limiter(key_func=get_remote_address)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+# -------------------------------------------------
+# Startup / shutdown
+# -------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Push system/stats updates into memory instead of reading per request
+    start_stats_listener()
+    # Public counters are summed in memory and written every few seconds
+    start_stats_flusher()
+    yield
+    stop_stats_flusher()
+    stop_stats_listener()
+    # Close pooled DataForSEO and OpenAI connections
+    close_http_session()
+    close_openai_client()
+
 
 # -------------------------------------------------
 # Create FastAPI app
 # -------------------------------------------------
 app = FastAPI(
     title="Semantic Pilot Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson encoder for every JSON response
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter to app state
@@ -1,11 +1,18 @@
-from pydantic import BaseModel
+from functools import cached_property
+from itertools import chain
+
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
 
 class LocationModel(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
     country: str
     region: str
     city: str
 
 class ResearchRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
     platform: str
     target_page_url: str
     service_or_topic: str
@@ -22,3 +29,39 @@ class ResearchRequest(BaseModel):
 
     location: LocationModel
     location_id: int | None = None
+
+
+class IntakeData(BaseModel):
+    """Fields of a research_intakes document used by keyword research."""
+    model_config = ConfigDict(extra="ignore")
+
+    target_location: str = ""
+    suggested_search_terms: str = ""
+    product_service_description: str = ""
+    target_page_url: str = ""
+    negative_keywords: str = ""
+    excluded_brands: str = ""
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _none_to_empty(cls, value):
+        # Intake fields are optional in the form and may be stored as null
+        return "" if value is None else value
+
+    @field_validator("*", mode="after")
+    @classmethod
+    def _strip(cls, value: str) -> str:
+        return value.strip()
+
+    @computed_field
+    @cached_property
+    def seed_keywords(self) -> list[str]:
+        """Comma-split search terms, plus the product description when short.
+
+        Duplicates are dropped (first occurrence kept) since each seed is billed by DataForSEO.
+        """
+        terms = (t.strip() for t in self.suggested_search_terms.split(","))
+        product = self.product_service_description
+        if product and len(product) < 100:
+            terms = chain(terms, (product,))
+        return list(dict.fromkeys(t for t in terms if t))
@@ -3,6 +3,7 @@ from fastapi.responses import StreamingResponse
 from app.services.firestore import db
 import firebase_admin
 from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, verify_id_token_cached
 from datetime import datetime
 import csv
 import io
@@ -19,13 +20,10 @@ def export_research_data(authorization: str | None = Header(default=None)):
     Export all user research reports as CSV file.
     Returns CSV with research history for easy analysis in Excel/Google Sheets.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         # Query the user's research subcollection: users/{uid}/research
@@ -155,13 +153,10 @@ def export_single_research(researchId: str, authorization: str | None = Header(d
     """
     Export a single research report as CSV file.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         # Get metadata from research_intakes or from the user's research subcollection
@@ -287,13 +282,10 @@ def update_email_preferences(body: dict, authorization: str | None = Header(defa
     """
     Update user email notification preferences.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         email_notifications = body.get("emailNotifications", True)
@@ -326,13 +318,10 @@ def change_email_address(body: dict, authorization: str | None = Header(default=
     """
     Change user's email address in both Firebase Auth and Firestore.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         new_email = body.get("newEmail", "").strip()
@@ -377,13 +366,10 @@ def delete_user_account(authorization: str | None = Header(default=None)):
     Permanently delete user account and all associated data.
     This action is irreversible and complies with GDPR right to erasure.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
         email = decoded.get("email", "unknown")
 
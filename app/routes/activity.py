@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Header, HTTPException
-from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, verify_id_token_cached
 from app.services.firestore import db
 from google.cloud import firestore  # REQUIRED for SERVER_TIMESTAMP
 
@@ -10,11 +10,8 @@ router = APIRouter(prefix="/activity", tags=["Activity"])
 # Helper: Extract UID from Firebase token
 # -----------------------------------------------------
 def get_uid_from_header(authorization: str | None):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    token = authorization.split(" ")[1]
-    decoded = firebase_auth.verify_id_token(token)
+    token = bearer_token(authorization, detail="Invalid token")
+    decoded = verify_id_token_cached(token)
     return decoded["uid"]
 
 
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Header, HTTPException
 from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, invalidate_role_cache, verify_id_token_cached
 from app.services.firestore import db
 from app.utils.cost_calculator import get_cost_per_1k_tokens, calculate_openai_cost
+from app.services.content_generator import invalidate_model_setting_cache
 from datetime import datetime
+from google.cloud import firestore as gcfirestore
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -16,16 +19,10 @@ def require_admin(authorization: str | None):
     verify it, look up the user in Firestore, and ensure they
     have role == "admin" or "tester".
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=401,
-            detail="Missing or invalid Authorization header",
-        )
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         # Fetch user record from Firestore
@@ -33,7 +30,6 @@ def require_admin(authorization: str | None):
 
         if not doc.exists:
             # Auto-create user with default role
-            from datetime import datetime
             email = decoded.get("email")
             display_name = decoded.get("name")
             
@@ -46,13 +42,13 @@ def require_admin(authorization: str | None):
                 "monthlyCredits": 30,
                 "dailyCreditsUsed": 0,
                 "dailyLimit": 5,
-                "lastCreditReset": datetime.utcnow().isoformat(),
-                "lastDailyReset": datetime.utcnow().isoformat(),
+                "lastCreditReset": gcfirestore.SERVER_TIMESTAMP,
+                "lastDailyReset": gcfirestore.SERVER_TIMESTAMP,
                 "researchCount": 0,
                 "tokenUsage": 0,
                 "totalSpend": 0.0,
-                "createdAt": datetime.utcnow().isoformat(),
-                "lastLoginAt": datetime.utcnow().isoformat(),
+                "createdAt": gcfirestore.SERVER_TIMESTAMP,
+                "lastLoginAt": gcfirestore.SERVER_TIMESTAMP,
                 "uid": uid,
             }
             
@@ -174,8 +170,8 @@ def reset_credits(uid: str, authorization: str | None = Header(default=None)):
     db.collection("users").document(uid).update({
         "credits": 30,
         "dailyCreditsUsed": 0,
-        "lastCreditReset": datetime.utcnow().isoformat(),
-        "lastDailyReset": datetime.utcnow().isoformat()
+        "lastCreditReset": gcfirestore.SERVER_TIMESTAMP,
+        "lastDailyReset": gcfirestore.SERVER_TIMESTAMP
     })
     return {"status": "success", "message": "Credits reset to 30 (monthly limit)"}
 
@@ -215,6 +211,7 @@ def make_admin(uid: str, authorization: str | None = Header(default=None)):
     require_admin(authorization)
 
     db.collection("users").document(uid).update({"role": "admin"})
+    invalidate_role_cache(uid)
     return {"status": "success", "message": "User promoted to admin"}
 
 
@@ -226,6 +223,7 @@ def remove_admin(uid: str, authorization: str | None = Header(default=None)):
     require_admin(authorization)
 
     db.collection("users").document(uid).update({"role": "user"})
+    invalidate_role_cache(uid)
     return {"status": "success", "message": "Admin role removed"}
 
 
@@ -243,6 +241,7 @@ def make_tester_by_email(email: str, authorization: str | None = Header(default=
         
         # Update user role to tester in Firestore
         db.collection("users").document(uid).update({"role": "tester"})
+        invalidate_role_cache(uid)
         
         return {"status": "success", "message": f"User {email} promoted to tester", "uid": uid}
     except firebase_auth.UserNotFoundError:
@@ -323,6 +322,7 @@ def update_openai_model(
         "model": req.model,
         "updated_at": firestore.SERVER_TIMESTAMP,
     }, merge=True)
+    invalidate_model_setting_cache()
     
     return {"status": "success", "model": req.model}
 
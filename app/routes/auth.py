@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Header
 from app.services.firestore import db
 import firebase_admin
-from firebase_admin import auth as firebase_auth
-from datetime import datetime
+from app.utils.auth import bearer_token, verify_id_token_cached
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -48,14 +48,11 @@ def get_current_user(authorization: str | None = Header(default=None)):
         raise HTTPException(status_code=401, detail="Missing Authorization header")
 
     # Wrong format
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization, detail="Invalid Authorization header")
 
     try:
         # Verify Firebase ID Token
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
         email = decoded.get("email")
 
@@ -84,7 +81,7 @@ def get_current_user(authorization: str | None = Header(default=None)):
                 )
 
             # Always update lastLoginAt on each request
-            data["lastLoginAt"] = datetime.utcnow().isoformat()
+            data["lastLoginAt"] = datetime.now(timezone.utc)
             data["uid"] = uid
 
             # Save fixed document
@@ -115,13 +112,10 @@ def update_profile(
 ):
     """Update user profile fields like firstName."""
     
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
         
         user_ref = db.collection("users").document(uid)
@@ -153,13 +147,10 @@ def upgrade_plan(
     Adds additional credits when upgrading.
     """
 
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
 
         user_ref = db.collection("users").document(uid)
@@ -190,7 +181,7 @@ def upgrade_plan(
         user_ref.update({
             "plan": "pro",
             "credits": new_credits,
-            "lastLoginAt": datetime.utcnow().isoformat(),
+            "lastLoginAt": datetime.now(timezone.utc),
         })
 
         return {"status": "upgraded", "plan": "pro", "credits": new_credits}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Request, BackgroundTasks
-from app.utils.auth import verify_token
+from app.utils.auth import bearer_token, verify_id_token_cached, verify_token
 from app.services.firestore import db
 from app.services.content_generator import (
     generate_blog_ideas, 
@@ -9,6 +9,9 @@ from app.services.content_generator import (
     generate_google_ads_landing_page,
     generate_google_ads_negative_keywords,
     generate_google_ads_structure,
+    generate_all_google_ads,
+    generate_blog_ideas_many,
+    generate_meta_tags_many,
 )
 from app.services.google_ads_utm import generate_google_ads_utm
 from google.cloud import firestore as gcfirestore
@@ -34,6 +37,23 @@ def get_user_id(request: Request) -> str:
     return "anonymous"
 
 
+@gcfirestore.transactional
+def _consume_credits(transaction, user_ref, amount: int):
+    """Check the balance and deduct credits in one transaction.
+
+    Raises HTTPException (404/402) when the user is missing or short of credits.
+    """
+    snapshot = user_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        raise HTTPException(status_code=404, detail="User not found")
+    if (snapshot.to_dict() or {}).get("credits", 0) < amount:
+        raise HTTPException(status_code=402, detail="Insufficient credits")
+    transaction.update(user_ref, {
+        "credits": gcfirestore.Increment(-amount),
+        "lastActivity": gcfirestore.SERVER_TIMESTAMP,
+    })
+
+
 def generate_blog_draft_background(
     user_id: str,
     research_id: str,
@@ -227,7 +247,8 @@ async def handle_blog_ideas(
         keywords = keywords_doc.to_dict()
         
         # Generate blog ideas
-        result = generate_blog_ideas(
+        result = await asyncio.to_thread(
+            generate_blog_ideas,
             intake=intake,
             keywords=keywords,
             user_id=user_id,
@@ -332,7 +353,8 @@ async def handle_meta_tags(
         keywords = keywords_doc.to_dict()
         
         # Generate meta tags
-        result = generate_meta_tags(
+        result = await asyncio.to_thread(
+            generate_meta_tags,
             intake=intake,
             keywords=keywords,
             user_id=user_id,
@@ -423,7 +445,8 @@ async def handle_page_content(
         keywords = keywords_doc.to_dict()
         
         # Generate page content
-        result = generate_page_content(
+        result = await asyncio.to_thread(
+            generate_page_content,
             intake=intake,
             keywords=keywords,
             user_id=user_id,
@@ -446,14 +469,10 @@ async def handle_page_content(
 async def generate_page_content_post(request: Request):
     """Generate page content directly from frontend request"""
     # Extract and verify token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = bearer_token(request.headers.get("Authorization"))
     
     try:
-        from firebase_admin import auth as firebase_auth
-        token = auth_header.replace("Bearer ", "")
-        user_data = firebase_auth.verify_id_token(token)
+        user_data = verify_id_token_cached(token)
     except Exception as e:
         print(f"[Token Verify] Error: {e}")
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -486,7 +505,8 @@ async def generate_page_content_post(request: Request):
             should_deduct_credit = True
         
         # Start content generation immediately (don't wait for credit deduction)
-        result = generate_page_content(
+        result = await asyncio.to_thread(
+            generate_page_content,
             primary_keywords=primary_keywords,
             secondary_keywords=secondary_keywords,
             long_tail_keywords=long_tail_keywords,
@@ -522,14 +542,10 @@ async def generate_page_content_async(request: Request, background_tasks: Backgr
     sys.stdout.flush()
     
     # Extract and verify token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = bearer_token(request.headers.get("Authorization"))
     
     try:
-        from firebase_admin import auth as firebase_auth
-        token = auth_header.replace("Bearer ", "")
-        user_data = firebase_auth.verify_id_token(token)
+        user_data = verify_id_token_cached(token)
     except Exception as e:
         print(f"[Token Verify] Error: {e}")
         sys.stdout.flush()
@@ -625,14 +641,10 @@ async def generate_page_content_async(request: Request, background_tasks: Backgr
 async def generate_blog_ideas_post(request: Request):
     """Generate blog ideas directly from frontend request"""
     # Extract and verify token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = bearer_token(request.headers.get("Authorization"))
     
     try:
-        from firebase_admin import auth as firebase_auth
-        token = auth_header.replace("Bearer ", "")
-        user_data = firebase_auth.verify_id_token(token)
+        user_data = verify_id_token_cached(token)
     except Exception as e:
         print(f"[Token Verify] Error: {e}")
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -663,7 +675,8 @@ async def generate_blog_ideas_post(request: Request):
             should_deduct_credit = True
         
         # Start generation immediately (don't wait for credit deduction)
-        result = generate_blog_ideas(
+        result = await asyncio.to_thread(
+            generate_blog_ideas,
             primary_keywords=primary_keywords,
             user_intake_form=user_intake_form,
             research_data=research_data,
@@ -694,14 +707,10 @@ async def generate_blog_ideas_post(request: Request):
 async def generate_meta_tags_post(request: Request):
     """Generate meta tags directly from frontend request"""
     # Extract and verify token from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+    token = bearer_token(request.headers.get("Authorization"))
     
     try:
-        from firebase_admin import auth as firebase_auth
-        token = auth_header.replace("Bearer ", "")
-        user_data = firebase_auth.verify_id_token(token)
+        user_data = verify_id_token_cached(token)
     except Exception as e:
         print(f"[Token Verify] Error: {e}")
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -734,7 +743,8 @@ async def generate_meta_tags_post(request: Request):
             should_deduct_credit = True
         
         # Start generation immediately (don't wait for credit deduction)
-        result = generate_meta_tags(
+        result = await asyncio.to_thread(
+            generate_meta_tags,
             primary_keywords=primary_keywords,
             secondary_keywords=secondary_keywords,
             long_tail_keywords=long_tail_keywords,
@@ -763,6 +773,83 @@ async def generate_meta_tags_post(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Fields a batch item may pass through to the generator
+BATCH_ITEM_FIELDS = ("primary_keywords", "secondary_keywords", "long_tail_keywords", "user_intake_form", "research_data")
+MAX_BATCH_ITEMS = 20
+
+
+async def _generate_batch(generate_many, request: Request, user_id: str) -> dict:
+    """Shared body of the batch endpoints: credit check, parallel generation, charge per success.
+
+    The body is {"items": [...]}, each item holding the same fields as the
+    single POST endpoint. Items are generated in parallel; every item gets its
+    own success or error entry and only successful items cost a credit.
+    """
+    body = await request.json()
+    items = body.get("items")
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        raise HTTPException(status_code=400, detail="items must be a non-empty list of objects")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} items per request")
+    
+    user_ref = db.collection("users").document(user_id)
+    user_doc = await asyncio.to_thread(user_ref.get)
+    if not user_doc.exists:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user_firestore_data = user_doc.to_dict() or {}
+    user_role = user_firestore_data.get("role", "user")
+    
+    # Skip credit check for admin and tester users
+    should_deduct_credit = user_role not in ["admin", "tester"]
+    if should_deduct_credit and (user_firestore_data.get("credits") or 0) < len(items):
+        raise HTTPException(status_code=402, detail="Insufficient credits. Please purchase more credits.")
+    
+    results = await generate_many([
+        {**{field: item[field] for field in BATCH_ITEM_FIELDS if field in item}, "user_id": user_id}
+        for item in items
+    ])
+    succeeded = sum(1 for result in results if not isinstance(result, BaseException))
+    
+    # Deduct credits AFTER generation, one per successful item
+    if should_deduct_credit and succeeded:
+        try:
+            await asyncio.to_thread(user_ref.update, {"credits": gcfirestore.Increment(-succeeded)})
+        except Exception as e:
+            print(f"[Warning] Credit deduction failed but content was generated: {e}")
+    
+    return {
+        "status": "success",
+        "data": [
+            {"status": "error", "detail": str(result)} if isinstance(result, BaseException)
+            else {"status": "success", "data": result}
+            for result in results
+        ],
+    }
+
+
+@router.post("/meta-tags/batch")
+async def generate_meta_tags_batch(request: Request, token_data: dict = Depends(verify_token)):
+    """Generate meta tags for several keyword sets in parallel. One credit per generated item."""
+    try:
+        return await _generate_batch(generate_meta_tags_many, request, token_data["uid"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/blog-ideas/batch")
+async def generate_blog_ideas_batch(request: Request, token_data: dict = Depends(verify_token)):
+    """Generate blog ideas for several keyword sets in parallel. One credit per generated item."""
+    try:
+        return await _generate_batch(generate_blog_ideas_many, request, token_data["uid"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/ad-copy/{user_id}/{research_id}")
 @limiter.limit("50/hour", key_func=get_user_id)
 async def handle_ad_copy(
@@ -817,7 +904,8 @@ async def handle_ad_copy(
         if not keywords_doc.exists:
             raise HTTPException(status_code=404, detail="Keywords not found")
         
-        result = generate_google_ads_ad_copy(
+        result = await asyncio.to_thread(
+            generate_google_ads_ad_copy,
             intake=intake_doc.to_dict(),
             keywords=keywords_doc.to_dict(),
             user_id=user_id,
@@ -884,7 +972,8 @@ async def handle_landing_page(
         if not keywords_doc.exists:
             raise HTTPException(status_code=404, detail="Keywords not found")
         
-        result = generate_google_ads_landing_page(
+        result = await asyncio.to_thread(
+            generate_google_ads_landing_page,
             intake=intake_doc.to_dict(),
             keywords=keywords_doc.to_dict(),
             user_id=user_id,
@@ -951,7 +1040,8 @@ async def handle_negative_keywords(
         if not keywords_doc.exists:
             raise HTTPException(status_code=404, detail="Keywords not found")
         
-        result = generate_google_ads_negative_keywords(
+        result = await asyncio.to_thread(
+            generate_google_ads_negative_keywords,
             intake=intake_doc.to_dict(),
             keywords=keywords_doc.to_dict(),
             user_id=user_id,
@@ -1017,7 +1107,8 @@ async def handle_structure(
         if not keywords_doc.exists:
             raise HTTPException(status_code=404, detail="Keywords not found")
         
-        result = generate_google_ads_structure(
+        result = await asyncio.to_thread(
+            generate_google_ads_structure,
             intake=intake_doc.to_dict(),
             keywords=keywords_doc.to_dict(),
             user_id=user_id,
@@ -1032,6 +1123,86 @@ async def handle_structure(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/google-ads/{user_id}/{research_id}")
+@limiter.limit("50/hour", key_func=get_user_id)
+async def handle_google_ads_bundle(
+    request: Request,
+    user_id: str,
+    research_id: str,
+    token_data: dict = Depends(verify_token),
+    generate: bool = Query(default=True),
+):
+    """Generate or retrieve landing page, negative keywords and campaign structure together.
+    
+    The three generations run concurrently and cost one credit each. ADMIN AND TESTER. Rate limited: 50/hour.
+    """
+    
+    uid = token_data["uid"]
+    user_ref = db.collection("users").document(uid)
+    user_doc = await asyncio.to_thread(user_ref.get)
+    user_role = user_doc.to_dict().get("role") if user_doc.exists else None
+    
+    # Allow both admin and tester roles
+    if not user_doc.exists or user_role not in ["admin", "tester"]:
+        raise HTTPException(status_code=403, detail="Admin or Tester access required")
+    
+    if uid != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    try:
+        research_col = db.collection("intakes").document(user_id).collection(research_id)
+        
+        if not generate:
+            # One batched read for the three stored results
+            docs = await asyncio.to_thread(lambda: list(db.get_all([
+                research_col.document("landing_page"),
+                research_col.document("negative_keywords"),
+                research_col.document("structure"),
+            ])))
+            if all(doc.exists for doc in docs):
+                return {"status": "success", "data": {doc.id: doc.to_dict() for doc in docs}}
+        
+        doc_id = f"{user_id}_{research_id}"
+        intake_ref = db.collection("research_intakes").document(doc_id)
+        keywords_ref = research_col.document("keyword_research")
+        # get_all does not keep request order
+        snapshots = await asyncio.to_thread(
+            lambda: {doc.reference.path: doc for doc in db.get_all([intake_ref, keywords_ref])}
+        )
+        intake_doc = snapshots[intake_ref.path]
+        keywords_doc = snapshots[keywords_ref.path]
+        if not intake_doc.exists:
+            raise HTTPException(status_code=404, detail="Intake not found")
+        if not keywords_doc.exists:
+            raise HTTPException(status_code=404, detail="Keywords not found")
+        
+        # Charge only once the inputs are known to exist; the transaction
+        # reserves the credits so concurrent bundles can't overspend
+        await asyncio.to_thread(_consume_credits, db.transaction(), user_ref, 3)
+        
+        try:
+            result = await generate_all_google_ads(
+                intake=intake_doc.to_dict(),
+                keywords=keywords_doc.to_dict(),
+                user_id=user_id,
+                research_id=research_id,
+            )
+        except BaseException:
+            # Nothing was saved (the results commit last), so give the credits back
+            try:
+                await asyncio.to_thread(user_ref.update, {"credits": gcfirestore.Increment(3)})
+            except Exception as refund_error:
+                print(f"[Warning] Credit refund failed for {uid}: {refund_error}")
+            raise
+        
+        return {"status": "success", "data": result}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/utm-tags/{user_id}/{research_id}")
 @limiter.limit("50/hour", key_func=get_user_id)
 async def handle_utm_tags(
@@ -1083,7 +1254,8 @@ async def handle_utm_tags(
         if not keywords_doc.exists:
             raise HTTPException(status_code=404, detail="Keywords not found")
 
-        result = generate_google_ads_utm(
+        result = await asyncio.to_thread(
+            generate_google_ads_utm,
             intake=intake_doc.to_dict(),
             keywords_doc=keywords_doc.to_dict(),
         )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Header, HTTPException
-from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, verify_id_token_cached
 from app.services.firestore import db
 from app.services.email_service import send_email, send_bulk_email
 from typing import Optional
@@ -9,11 +9,9 @@ router = APIRouter(prefix="/admin/email", tags=["Admin Email"])
 
 def _verify_admin(authorization: str | None):
     """Verify admin authorization and return uid."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         uid = decoded["uid"]
         user = db.collection("users").document(uid).get().to_dict() or {}
         if user.get("role") not in ["admin", "tester"]:
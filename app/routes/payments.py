@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Header, HTTPException, Request
 from app.services.firestore import db
-from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, verify_id_token_cached
 from app.core.config import STRIPE_SECRET_KEY, STRIPE_PRICE_PRO, STRIPE_WEBHOOK_SECRET, STRIPE_DUMMY_MODE
 import stripe
-from datetime import datetime
+from datetime import datetime, timezone
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
@@ -12,11 +12,9 @@ if STRIPE_SECRET_KEY:
 
 
 def _require_auth(authorization: str | None):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         return decoded["uid"], decoded
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -101,7 +99,7 @@ async def stripe_webhook(request: Request):
                     user_ref.update({
                         "plan": "pro",
                         "credits": new_credits,
-                        "lastLoginAt": datetime.utcnow().isoformat(),
+                        "lastLoginAt": datetime.now(timezone.utc),
                         "stripeCheckoutId": session.get("id"),
                         "stripeCustomerId": session.get("customer"),
                         "stripeSubscriptionId": session.get("subscription"),
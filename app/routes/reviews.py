@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Header, HTTPException
-from firebase_admin import auth as firebase_auth
+from app.utils.auth import bearer_token, verify_id_token_cached
 from app.services.firestore import db
 from datetime import datetime
 
@@ -7,11 +7,9 @@ router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
 
 def _auth(authorization: str | None):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    token = authorization.split(" ")[1]
+    token = bearer_token(authorization)
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = verify_id_token_cached(token)
         return decoded["uid"], decoded
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -1,67 +1,245 @@
-from fastapi import APIRouter, Header, HTTPException, Request
-from pydantic import BaseModel
-from app.models.seo_models import ResearchRequest
-from firebase_admin import auth as firebase_auth
+import os
+import asyncio
+import logging
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timezone
+from itertools import chain
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from app.models.seo_models import IntakeData, ResearchRequest
 from google.cloud import firestore as gcfirestore
-from app.services.dataforseo import fetch_keyword_ideas as dfs_fetch_keyword_ideas
-from app.services.firestore import db
+from google.cloud.firestore_v1 import Client, DocumentReference
+from app.services.dataforseo import (
+    fetch_keyword_ideas as dfs_fetch_keyword_ideas,
+    filter_keywords_by_intake,
+    get_dataforseo_cost,
+)
+from app.services.firestore import get_db
+from app.services import stats_counter
+from app.services.geo_resolver import resolve_geo_id
 from app.services.keyword_planner_builder import build_keyword_planner_request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.services.keyword_ai_filter import run_keyword_ai_filter
+from app.utils.auth import bearer_token, get_user_role_cached, verify_id_token_cached
+from app.utils.rate_limit import TokenBucket, limiter
+from app.services.keyword_research_store import (
+    delete_keyword_research as delete_keyword_research_doc,
+    load_raw_output,
+    save_raw_output,
+)
 
-router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
+
+# Responses carry large keyword lists; orjson encodes them much faster than stdlib json
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Helper to authenticate user
 def get_uid(authorization: str | None):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
-    decoded = firebase_auth.verify_id_token(token)
+    decoded = verify_id_token_cached(bearer_token(authorization))
     return decoded["uid"]
 
 
+def firestore_client() -> Client:
+    """FastAPI dependency: the Firestore client for this request.
+
+    FastAPI resolves a dependency once per request, so current_user and the
+    route get the same client and can share batches and transactions.
+    """
+    return get_db()
+
+
+def current_user(
+    request: Request,
+    authorization: str | None = Header(default=None),
+    client: Client = Depends(firestore_client),
+) -> tuple[str, DocumentReference]:
+    """FastAPI dependency: authenticate the caller and return (uid, users/{uid} ref).
+
+    Sync on purpose so FastAPI runs the token check in its threadpool. The uid
+    is also stored on request.state, where the limiter's key function reads it;
+    dependencies run before slowapi's check, so limited routes get per-user keys.
+    """
+    uid = get_uid(authorization)
+    request.state.uid = uid
+    return uid, client.collection("users").document(uid)
+
+
+def _keyword_research_ref(client: Client, user_id: str, intake_id: str):
+    """intakes/{userId}/{intakeId}/keyword_research"""
+    return client.collection("intakes").document(user_id).collection(intake_id).document("keyword_research")
+
+
+# Set SEO_DEBUG to dump full keyword objects when saving research results
+_SEO_DEBUG = bool(os.getenv("SEO_DEBUG"))
+
+# DataForSEO results keyed by request parameters. Volumes shift daily, so 24h TTL.
+# Values are orjson bytes so every hit hands out fresh, unshared dicts.
+_dfs_cache: TTLCache = TTLCache(maxsize=512, ttl=86400)
+_dfs_cache_lock = threading.Lock()
+
+
+def _dfs_cache_key(seed_keywords: list, location_name: str, url: str | None = None) -> str:
+    payload = orjson.dumps(
+        {"seeds": sorted(seed_keywords or []), "loc": str(location_name), "url": url or ""},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return "dfs:" + hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _dfs_cache_get(key: str) -> list | None:
+    """Cached raw keywords for key (fresh dicts), or None."""
+    with _dfs_cache_lock:
+        cached = _dfs_cache.get(key)
+    return orjson.loads(cached) if cached is not None else None
+
+
+def _fetch_keyword_ideas_with_cost(
+    seed_keywords: list, location_name: str, url: str | None = None
+) -> tuple[list, float, str]:
+    """Run a DataForSEO fetch and read its cost on the same worker thread.
+
+    Returns (raw_keywords, cost, cache_key); a cache hit costs nothing.
+    """
+    key = _dfs_cache_key(seed_keywords, location_name, url)
+    cached = _dfs_cache_get(key)
+    if cached is not None:
+        return cached, 0.0, key
+
+    raw_keywords = dfs_fetch_keyword_ideas(seed_keywords=seed_keywords, location_name=location_name, url=url)
+    cost = get_dataforseo_cost()
+    if raw_keywords:
+        with _dfs_cache_lock:
+            _dfs_cache[key] = orjson.dumps(raw_keywords)
+    return raw_keywords, cost, key
+
+
+def invalidate_dfs_cache(key: str | None) -> None:
+    if key:
+        with _dfs_cache_lock:
+            _dfs_cache.pop(key, None)
+
+
+# Bound in-flight DataForSEO calls per worker so bursts don't trip vendor rate limits
+_DFS_SEM = asyncio.Semaphore(int(os.getenv("DFS_MAX_INFLIGHT", "8")))
+# How long interactive requests wait for a slot before giving up with 503
+_DFS_ACQUIRE_TIMEOUT_SECONDS = 5
+
+
+# Per-worker single-flight: cache key -> future of the fetch currently running for it
+_dfs_inflight: dict[str, asyncio.Future] = {}
+
+
+class _DfsLeaderGaveUp(Exception):
+    """Set on a single-flight future when its leader stops without a result
+    (cancelled, or no DataForSEO slot in time); followers then retry."""
+
+
+async def _fetch_keyword_ideas_limited(
+    *,
+    fail_fast: bool = False,
+    seed_keywords: list,
+    location_name: str,
+    url: str | None = None,
+) -> tuple[list, float, str]:
+    """_fetch_keyword_ideas_with_cost under the DataForSEO concurrency limit.
+
+    Concurrent calls with the same parameters share one DataForSEO request;
+    only the first caller is charged the cost. If that caller is cancelled or
+    gives up waiting for a slot, the others retry, one of them as the new leader.
+    fail_fast=True raises 503 instead of queueing when all slots stay busy.
+    """
+    key = _dfs_cache_key(seed_keywords, location_name, url)
+    # Cache hits need no DataForSEO slot, so they never queue or get a 503
+    cached = _dfs_cache_get(key)
+    if cached is not None:
+        return cached, 0.0, key
+    while (inflight := _dfs_inflight.get(key)) is not None:
+        try:
+            raw_keywords, _, _ = await asyncio.shield(inflight)
+        except _DfsLeaderGaveUp:
+            continue
+        # Each caller gets its own dicts, as with cache hits
+        return orjson.loads(orjson.dumps(raw_keywords)), 0.0, key
+
+    future = asyncio.get_running_loop().create_future()
+    _dfs_inflight[key] = future
+    try:
+        if fail_fast:
+            try:
+                await asyncio.wait_for(_DFS_SEM.acquire(), timeout=_DFS_ACQUIRE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                future.set_exception(_DfsLeaderGaveUp())
+                future.exception()
+                raise HTTPException(status_code=503, detail="Keyword research is busy, please retry shortly")
+        else:
+            await _DFS_SEM.acquire()
+        try:
+            result = await asyncio.to_thread(
+                _fetch_keyword_ideas_with_cost,
+                seed_keywords=seed_keywords,
+                location_name=location_name,
+                url=url,
+            )
+        finally:
+            _DFS_SEM.release()
+    except asyncio.CancelledError:
+        # Not future.cancel(): that would cancel every follower along with us
+        if not future.done():
+            future.set_exception(_DfsLeaderGaveUp())
+            future.exception()
+        raise
+    except Exception as e:
+        if future.done():  # already handed to followers as _DfsLeaderGaveUp
+            raise
+        future.set_exception(e)
+        future.exception()  # followers re-raise it; don't log it as unretrieved
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _dfs_inflight.pop(key, None)
+
+
 @router.post("/seo/research")
+@limiter.limit("10/hour")  # Max 10 research requests per hour per user
 async def run_research(
+    request: Request,
+    response: Response,
     req: ResearchRequest,
-    authorization: str | None = Header(default=None)
+    user: tuple[str, DocumentReference] = Depends(current_user),
 ):
+    _, user_ref = user
 
-    uid = get_uid(authorization)
-
-    # Ensure user document exists before updates
-    user_ref = db.collection("users").document(uid)
-    snapshot = user_ref.get()
-    if not snapshot.exists:
-        user_ref.set({
-            "researchCount": 0,
-            "createdAt": gcfirestore.SERVER_TIMESTAMP,
-            "lastActivity": gcfirestore.SERVER_TIMESTAMP,
-            "online": True,
-        })
-
-    # Atomic increment + activity update
-    user_ref.update({
-        "researchCount": gcfirestore.Increment(1),
-        "lastActivity": gcfirestore.SERVER_TIMESTAMP,
-        "online": True,
-    })
+    # Resolve the location to a DataForSEO location code
+    if req.location_id is not None:
+        geo_id = str(req.location_id)
+    else:
+        geo_id = await resolve_geo_id(f"{req.location.city}, {req.location.country}")
+    if not geo_id:
+        raise HTTPException(status_code=400, detail="Could not resolve location to a location code")
 
     # RUN YOUR KEYWORD RESEARCH
     # Switch to DataForSEO for keyword collection
-    raw_keywords = dfs_fetch_keyword_ideas(
+    raw_keywords, dataforseo_cost, _ = await _fetch_keyword_ideas_limited(
+        fail_fast=True,
         seed_keywords=req.suggested_keywords,
-        location_name=req.location,
+        location_name=geo_id,
     )
     
-    # Track DataForSEO spend
+    # Atomic increment + activity update + DataForSEO spend in a single write.
+    # merge=True creates the user document if it is missing, so no existence probe.
     try:
-        from app.services.dataforseo import get_dataforseo_cost
-        dataforseo_cost = get_dataforseo_cost()
-        user_ref.update({
-            "dataforseoSpend": gcfirestore.Increment(dataforseo_cost)
-        })
+        await asyncio.to_thread(user_ref.set, {
+            "researchCount": gcfirestore.Increment(1),
+            "dataforseoSpend": gcfirestore.Increment(dataforseo_cost),
+            "lastActivity": gcfirestore.SERVER_TIMESTAMP,
+            "online": True,
+        }, merge=True)
     except Exception:
         pass  # Non-critical
     
@@ -73,28 +251,33 @@ async def run_research(
     return {
         "keywords_raw": raw_keywords,
         "location_used": req.location,
-        "location_id": req.location_id,
+        "location_id": geo_id,
         "debug_first_keyword": debug_sample,
     }
 
 
+# Per-user burst of 10 admin keyword research calls, refilled over an hour
+_keyword_research_bucket = TokenBucket(capacity=10, period=3600)
+
+
 # Request model for keyword research endpoint
 class KeywordResearchRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
     userId: str
     intakeId: str
 
 
 @router.post("/google-ads/keyword-research")
-@limiter.limit("10/hour")  # Max 10 keyword research requests per hour per IP
 async def keyword_research(
-    request: Request,
     req: KeywordResearchRequest,
-    authorization: str | None = Header(default=None)
+    user: tuple[str, DocumentReference] = Depends(current_user),
+    client: Client = Depends(firestore_client),
 ):
     """
     Execute keyword research based on a stored intake form.
     ADMIN ONLY - Consumes Google Ads API quota.
-    Rate limited: 10 requests/hour per IP.
+    Rate limited: token bucket of 10 requests per user, refilled over an hour.
     
     1. Loads intake from Firestore
     2. Resolves target location to GEO_ID
@@ -103,16 +286,18 @@ async def keyword_research(
     5. Saves results to Firestore
     """
     # Verify admin access
-    uid = get_uid(authorization)
-    user_ref = db.collection("users").document(uid)
-    user_doc = user_ref.get()
-    if not user_doc.exists or user_doc.to_dict().get("role") != "admin":
+    uid, user_ref = user
+    _keyword_research_bucket.check(uid)
+    intake_ref = client.collection("research_intakes").document(req.intakeId)
+    
+    # Role check (usually served from cache) and 1. intake load are independent reads
+    user_role, intake_doc = await asyncio.gather(
+        asyncio.to_thread(get_user_role_cached, user_ref),
+        asyncio.to_thread(intake_ref.get),
+    )
+    if user_role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # 1. Load intake from Firestore
-    intake_ref = db.collection("research_intakes").document(req.intakeId)
-    intake_doc = intake_ref.get()
-    
     if not intake_doc.exists:
         raise HTTPException(status_code=404, detail=f"Intake {req.intakeId} not found")
     
@@ -123,45 +308,42 @@ async def keyword_research(
     if not target_location:
         raise HTTPException(status_code=400, detail="target_location is required in intake")
     
-    # Call geo suggest service to find matching GEO_ID
-    # DataForSEO uses location_name directly, skip Google Ads geo resolution
-    geo_id = None
+    geo_id = await resolve_geo_id(target_location)
+    if not geo_id:
+        raise HTTPException(status_code=400, detail="Could not resolve location to a location code")
     
     # 3. Build Keyword Planner request using helper function
     kp_payload = build_keyword_planner_request(intake, geo_id)
     
     # 4. Fetch keyword ideas from Google Ads
     try:
-        raw_keyword_data = dfs_fetch_keyword_ideas(
+        raw_keyword_data, dataforseo_cost, _ = await _fetch_keyword_ideas_limited(
+            fail_fast=True,
             seed_keywords=kp_payload["seed_keywords"],
-            location_name=target_location,
+            location_name=geo_id,
         )
-        
-        # Track DataForSEO spend
-        try:
-            from app.services.dataforseo import get_dataforseo_cost
-            dataforseo_cost = get_dataforseo_cost()
-            user_ref.update({
-                "dataforseoSpend": gcfirestore.Increment(dataforseo_cost)
-            })
-        except Exception:
-            pass  # Non-critical
-            
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"DataForSEO keyword research failed: {str(e)}"
         )
     
-    # 5. Save results to Firestore
-    results_ref = db.collection("keyword_research_results").document(req.intakeId)
-    results_ref.set({
+    # 5. Save results and track DataForSEO spend in one batch commit
+    results_ref = client.collection("keyword_research_results").document(req.intakeId)
+    batch = client.batch()
+    batch.set(results_ref, {
         "intakeId": req.intakeId,
         "userId": req.userId,
         "createdAt": gcfirestore.SERVER_TIMESTAMP,
         "raw_keyword_data": raw_keyword_data,
         "status": "completed"
     })
+    batch.update(user_ref, {
+        "dataforseoSpend": gcfirestore.Increment(dataforseo_cost)
+    })
+    await asyncio.to_thread(batch.commit)
     
     # 6. Return success response
     return {
@@ -170,124 +352,324 @@ async def keyword_research(
     }
 
 
-@router.get("/keyword-research/run/{userId}/{intakeId}")
-async def run_keyword_research(
-    userId: str,
-    intakeId: str,
-    authorization: str | None = Header(default=None)
-):
+# Counters for a user document created on first keyword research
+NEW_USER_DEFAULTS = {
+    "researchCount": 0,
+    "tokenUsage": 0,
+    "credits": 30,  # Monthly credits
+    "monthlyCredits": 30,
+    "dailyCreditsUsed": 0,
+    "dailyLimit": 5,
+    "online": True,
+}
+
+
+def _as_utc_datetime(value):
+    """Normalise a stored reset timestamp.
+
+    Reset fields are written as server timestamps and come back as tz-aware
+    datetimes; ISO strings only exist on older user documents.
     """
-    Execute keyword research based on a stored intake form.
-    
-    This endpoint:
-    1. Loads intake from Firestore
-    2. Resolves target location to GEO_ID
-    3. Prepares seed keywords from intake fields
-    4. Calls Google Keyword Planner API
-    5. Saves raw results to Firestore under intakes/{userId}/{intakeId}/keyword_research/raw_output
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+@gcfirestore.transactional
+def _consume_research_credit(transaction, user_ref, now: datetime, research_ref=None, research_data: dict | None = None):
+    """Apply daily/monthly resets, check limits and deduct one research credit.
+
+    Runs as a single transaction: one read of the user document and one write.
+    When research_ref is given, research_data is written to it in the same
+    commit, so the research document exists exactly when the credit was spent.
+    Raises HTTPException (429/402) when the user is over a limit.
     """
-    uid = get_uid(authorization)
-    
-    # Security check: ensure the authenticated user matches the userId in path
-    if uid != userId:
-        raise HTTPException(status_code=403, detail="Unauthorized access to this intake")
-    
-    # Check user credits before proceeding
-    user_ref = db.collection("users").document(userId)
-    user_snapshot = user_ref.get()
-    
-    if not user_snapshot.exists:
-        user_ref.set({
-            "researchCount": 0,
-            "tokenUsage": 0,
-            "credits": 30,  # Monthly credits
-            "monthlyCredits": 30,
-            "dailyCreditsUsed": 0,
-            "dailyLimit": 5,
+    snapshot = user_ref.get(transaction=transaction)
+
+    if not snapshot.exists:
+        # First keyword research: create the user with this research already counted
+        transaction.set(user_ref, {
+            **NEW_USER_DEFAULTS,
+            "credits": NEW_USER_DEFAULTS["credits"] - 1,
+            "dailyCreditsUsed": 1,
+            "researchCount": 1,
             "lastCreditReset": gcfirestore.SERVER_TIMESTAMP,
             "lastDailyReset": gcfirestore.SERVER_TIMESTAMP,
             "createdAt": gcfirestore.SERVER_TIMESTAMP,
             "lastActivity": gcfirestore.SERVER_TIMESTAMP,
-            "online": True,
         })
-        user_snapshot = user_ref.get()
-    
-    user_data = user_snapshot.to_dict() or {}
+        if research_ref is not None:
+            transaction.set(research_ref, research_data)
+        return
+
+    user_data = snapshot.to_dict() or {}
     current_credits = user_data.get("credits", 0)
     daily_credits_used = user_data.get("dailyCreditsUsed", 0)
+    monthly_credits = user_data.get("monthlyCredits", 30)
     user_role = user_data.get("role", "user")
-    
+
     # Set daily limit based on role: unlimited for admin/tester, 5 for regular users
     if user_role == "admin" or user_role == "tester":
         daily_limit = float('inf')  # Unlimited daily credits for admin and tester
     else:
         daily_limit = user_data.get("dailyLimit", 5)
-    monthly_credits = user_data.get("monthlyCredits", 30)
-    last_daily_reset = user_data.get("lastDailyReset")
-    last_credit_reset = user_data.get("lastCreditReset")
-    
-    # Check and reset daily credits if needed
-    from datetime import datetime, timezone
-    now = datetime.now(timezone.utc)
-    
+
     updates = {}
-    
+
     # Reset daily counter if it's a new day
-    if last_daily_reset:
-        if isinstance(last_daily_reset, str):
-            last_daily_reset = datetime.fromisoformat(last_daily_reset.replace('Z', '+00:00'))
-        elif hasattr(last_daily_reset, 'replace'):
-            last_daily_reset = last_daily_reset.replace(tzinfo=timezone.utc)
-        
-        if last_daily_reset.date() < now.date():
-            updates["dailyCreditsUsed"] = 0
-            updates["lastDailyReset"] = now.isoformat()
-            daily_credits_used = 0
-    
+    last_daily_reset = _as_utc_datetime(user_data.get("lastDailyReset"))
+    if last_daily_reset and last_daily_reset.date() < now.date():
+        updates["lastDailyReset"] = gcfirestore.SERVER_TIMESTAMP
+        daily_credits_used = 0
+
     # Reset monthly credits if it's a new month
-    if last_credit_reset:
-        if isinstance(last_credit_reset, str):
-            last_credit_reset = datetime.fromisoformat(last_credit_reset.replace('Z', '+00:00'))
-        elif hasattr(last_credit_reset, 'replace'):
-            last_credit_reset = last_credit_reset.replace(tzinfo=timezone.utc)
-        
-        if last_credit_reset.month != now.month or last_credit_reset.year != now.year:
-            updates["credits"] = monthly_credits
-            updates["lastCreditReset"] = now.isoformat()
-            current_credits = monthly_credits
-    
-    # Apply resets if any
-    if updates:
-        user_ref.update(updates)
-    
+    last_credit_reset = _as_utc_datetime(user_data.get("lastCreditReset"))
+    if last_credit_reset and (last_credit_reset.month != now.month or last_credit_reset.year != now.year):
+        updates["lastCreditReset"] = gcfirestore.SERVER_TIMESTAMP
+        current_credits = monthly_credits
+
     # Check daily limit first
     if daily_credits_used >= daily_limit:
         raise HTTPException(
             status_code=429,
             detail=f"Daily limit reached. You can use up to {daily_limit} credits per day. Resets tomorrow."
         )
-    
+
     # Check if user has enough monthly credits (1 credit per research)
     if current_credits < 1:
         raise HTTPException(
             status_code=402,
             detail=f"Insufficient monthly credits. You have {current_credits}/{monthly_credits} credits remaining this month."
         )
-    
-    # Deduct 1 credit, increment daily usage, and increment research count atomically
-    user_ref.update({
-        "credits": gcfirestore.Increment(-1),
-        "dailyCreditsUsed": gcfirestore.Increment(1),
+
+    # Resets + deduct 1 credit, increment daily usage and research count in one write.
+    # Absolute values are safe here because the transaction read the current ones.
+    transaction.update(user_ref, {
+        **updates,
+        "credits": current_credits - 1,
+        "dailyCreditsUsed": daily_credits_used + 1,
         "researchCount": gcfirestore.Increment(1),
         "lastActivity": gcfirestore.SERVER_TIMESTAMP,
         "online": True,
     })
+    if research_ref is not None:
+        transaction.set(research_ref, research_data)
+
+
+def _save_structured_results(keyword_research_ref, structured: dict, raw_output: list, user_id: str, research_id: str):
+    """Write the AI-filtered keywords on top of the raw results summary."""
+    primary = structured.get("primary_keywords", [])
+    secondary = structured.get("secondary_keywords", [])
+    long_tail = structured.get("long_tail_keywords", [])
+    logger.debug(
+        "save counts user=%s intake=%s pri=%d sec=%d lt=%d raw=%d",
+        user_id, research_id, len(primary), len(secondary), len(long_tail), len(raw_output),
+    )
+    
+    # Spot-check DataForSEO data against what the AI filter kept
+    if logger.isEnabledFor(logging.DEBUG):
+        for idx, raw_kw in enumerate(raw_output[:3]):
+            logger.debug(
+                "raw[%d] %s vol=%s competition=%s",
+                idx, raw_kw.get("keyword"), raw_kw.get("avg_monthly_searches"), raw_kw.get("competition"),
+            )
+        if primary:
+            pk = primary[0]
+            logger.debug(
+                "first primary %s vol=%r competition=%s competition_index=%s low_bid=%s high_bid=%s trend_yoy=%s",
+                pk.get("keyword"), pk.get("search_volume"), pk.get("competition"), pk.get("competition_index"),
+                pk.get("low_top_of_page_bid_micros"), pk.get("high_top_of_page_bid_micros"), pk.get("trend_yoy"),
+            )
+            # Full dump of a large dict; opt-in via SEO_DEBUG and encoded with orjson
+            if _SEO_DEBUG:
+                logger.debug("first primary full object: %s", orjson.dumps(pk).decode())
+        if secondary:
+            sk = secondary[0]
+            logger.debug("first secondary %s vol=%r", sk.get("keyword"), sk.get("search_volume"))
+    
+    keyword_research_ref.set({
+        # Structured results (for frontend display)
+        "primary_keywords": primary,
+        "secondary_keywords": secondary,
+        "long_tail_keywords": long_tail,
+        "status": "completed",
+    }, merge=True)
+
+    logger.debug("keyword research saved user=%s intake=%s", user_id, research_id)
+
+
+async def _mark_keyword_research_failed(keyword_research_ref, error: str):
+    logger.error("keyword research failed: %s", error)
+    try:
+        await asyncio.to_thread(keyword_research_ref.set, {
+            "status": "failed",
+            "error": error,
+        }, merge=True)
+    except Exception as e:
+        logger.error("failed to record keyword research failure: %s", e)
+
+
+async def _dfs_stage(intake_fields: IntakeData, geo_id: str) -> tuple[list, float, str]:
+    """Fetch keyword ideas from DataForSEO and apply the intake's local filters."""
+    target_location = intake_fields.target_location
+    # Background job: wait for a free DataForSEO slot rather than failing
+    raw_output, dataforseo_cost, dfs_cache_key = await _fetch_keyword_ideas_limited(
+        seed_keywords=intake_fields.seed_keywords,
+        location_name=geo_id,
+        url=intake_fields.target_page_url or None,
+    )
+    logger.debug("DataForSEO cost tracked: $%.4f", dataforseo_cost)
     
-    # 1. Load intake from Firestore
+    # Filter keywords based on intake data (negative keywords, excluded brands, location relevance)
+    try:
+        logger.debug("applying multi-stage filters to %d keywords", len(raw_output))
+        raw_output = await asyncio.to_thread(
+            filter_keywords_by_intake,
+            keywords=raw_output,
+            negative_keywords=intake_fields.negative_keywords or None,
+            excluded_brands=intake_fields.excluded_brands or None,
+            location_name=target_location,  # Pass the target location for relevance filtering
+        )
+    except Exception as e:
+        logger.warning("local filtering failed: %s", e)
+        # Continue without filtering if it fails
+    
+    return raw_output, dataforseo_cost, dfs_cache_key
+
+
+def _save_raw_stage(
+    client: Client,
+    keyword_research_ref,
+    user_ref,
+    research_summary: dict,
+    raw_output: list,
+    *,
+    geo_id: str,
+    dataforseo_cost: float,
+    dfs_cache_key: str,
+):
+    """Write raw results plus the root summary, track DataForSEO spend and count the search."""
+    # Raw data (for debugging and audit trail) goes to keyword_research/raw_chunks in compressed chunks
+    raw_count = save_raw_output(keyword_research_ref, raw_output, client=client)
+    # Root document summary and the user's DataForSEO spend go in one batch commit
+    batch = client.batch()
+    # Root document keeps a small summary; merge=False to fully replace any stale data
+    batch.set(keyword_research_ref, {
+        **research_summary,
+        "raw_count": raw_count,
+        "status": "processing",
+        "geo_id": geo_id,
+        "dfs_cache_key": dfs_cache_key,  # lets the delete endpoint drop the cached DataForSEO result
+    }, merge=False)
+    # Track DataForSEO spend
+    batch.update(user_ref, {
+        "dataforseoSpend": gcfirestore.Increment(dataforseo_cost)
+    })
+    batch.commit()
+    stats_counter.increment("searches_ran")
+
+
+async def _run_keyword_research_pipeline(
+    *,
+    client: Client,
+    keyword_research_ref,
+    user_ref,
+    intake: dict,
+    intake_fields: IntakeData,
+    research_summary: dict,
+    geo_id: str,
+    user_id: str,
+    research_id: str,
+):
+    """Background part of run_keyword_research.
+
+    DataForSEO fetch + local filters, then the raw results write (with the
+    stats counter) and AI filter run concurrently, then the structured write.
+    Progress is reported through the keyword_research document's status field.
+    """
+    # 4. Call fetch_keyword_ideas() from DataForSEO
+    try:
+        raw_output, dataforseo_cost, dfs_cache_key = await _dfs_stage(intake_fields, geo_id)
+    except Exception as e:
+        await _mark_keyword_research_failed(keyword_research_ref, f"DataForSEO API failed: {str(e)}")
+        return
+    
+    # 5. Save raw results and bump the public stats counter, and 6. run the AI filter.
+    # These don't depend on each other, so they run side by side.
+    save_result, structured = await asyncio.gather(
+        asyncio.to_thread(
+            _save_raw_stage,
+            client,
+            keyword_research_ref,
+            user_ref,
+            research_summary,
+            raw_output,
+            geo_id=geo_id,
+            dataforseo_cost=dataforseo_cost,
+            dfs_cache_key=dfs_cache_key,
+        ),
+        asyncio.to_thread(
+            run_keyword_ai_filter,
+            intake=intake,
+            raw_output=raw_output,
+            user_id=user_id,
+            research_id=research_id,
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(save_result, Exception):
+        await _mark_keyword_research_failed(keyword_research_ref, f"Failed to save results to Firestore: {str(save_result)}")
+        return
+    if isinstance(structured, Exception):
+        await _mark_keyword_research_failed(keyword_research_ref, f"AI keyword filtering failed: {str(structured)}")
+        return
+    
+    # 7. Save structured results on top of the raw summary; status flips to "completed"
+    try:
+        await asyncio.to_thread(
+            _save_structured_results, keyword_research_ref, structured, raw_output, user_id, research_id
+        )
+    except Exception as e:
+        logger.error("failed to save structured keyword research: %s", e)
+
+
+@router.get("/keyword-research/run/{userId}/{intakeId}", status_code=202)
+@limiter.limit("10/hour")  # Max 10 keyword research runs per hour per user
+async def run_keyword_research(
+    request: Request,
+    response: Response,
+    userId: str,
+    intakeId: str,
+    background_tasks: BackgroundTasks,
+    user: tuple[str, DocumentReference] = Depends(current_user),
+    client: Client = Depends(firestore_client),
+):
+    """
+    Start keyword research based on a stored intake form.
+    
+    This endpoint validates the intake, resolves the target location to a
+    location code, deducts a credit and returns 202 with a job_id.
+    The rest runs as a background task:
+    1. Calls DataForSEO and applies local filters
+    2. Saves raw results under intakes/{userId}/{intakeId}/keyword_research/raw_chunks (gzip-compressed)
+    3. Runs the AI filter and saves structured results
+    
+    Poll intakes/{userId}/{intakeId}/keyword_research: status goes
+    queued -> processing -> completed (or failed, with an error message).
+    Rate limited: 10/hour per user.
+    """
     # Document ID format: {userId}_{intakeId}
-    doc_id = f"{userId}_{intakeId}"
-    intake_ref = db.collection("research_intakes").document(doc_id)
-    intake_doc = intake_ref.get()
+    user_ref = client.collection("users").document(userId)
+    intake_ref = client.collection("research_intakes").document(f"{userId}_{intakeId}")
+    uid, _ = user
+    intake_doc = await asyncio.to_thread(intake_ref.get)
+    
+    # Security check: ensure the authenticated user matches the userId in path
+    if uid != userId:
+        raise HTTPException(status_code=403, detail="Unauthorized access to this intake")
     
     if not intake_doc.exists:
         raise HTTPException(
@@ -296,34 +678,18 @@ async def run_keyword_research(
         )
     
     intake = intake_doc.to_dict()
+    intake_fields = IntakeData.model_validate(intake)
     
-    # 2. Extract target location and resolve to GEO_ID
-    target_location = intake.get("target_location", "").strip()
+    # Extract target location (validated before any credit is charged)
+    target_location = intake_fields.target_location
     if not target_location:
         raise HTTPException(
             status_code=400, 
             detail="target_location is missing in intake data"
         )
     
-    # Location cleaning is now handled inside dataforseo.fetch_keyword_ideas()
-    # Call geo suggest service to find matching GEO_ID
-    geo_id = None
-    # DataForSEO flow: no geo_id required, use location_name directly
-    
-    # 3. Prepare seed keywords from intake
-    # Combine relevant fields into seed keywords
-    seed_keywords = []
-    
-    # Add suggested_search_terms (split by comma)
-    suggested_terms = intake.get("suggested_search_terms", "").strip()
-    if suggested_terms:
-        terms = [t.strip() for t in suggested_terms.split(",") if t.strip()]
-        seed_keywords.extend(terms)
-    
-    # Optionally add product/service description as a seed
-    product_desc = intake.get("product_service_description", "").strip()
-    if product_desc and len(product_desc) < 100:  # Only if reasonably short
-        seed_keywords.append(product_desc)
+    # Prepare seed keywords from intake (suggested_search_terms + short product description)
+    seed_keywords = intake_fields.seed_keywords
     
     # If no seed keywords found, return error
     if not seed_keywords:
@@ -332,189 +698,123 @@ async def run_keyword_research(
             detail="No seed keywords found. Please provide 'suggested_search_terms' in the intake."
         )
     
-    # 4. Call fetch_keyword_ideas() from google_ads.py
-    try:
-        # Get target URL from intake
-        target_url = intake.get("target_page_url", "").strip()
-        
-        raw_output = dfs_fetch_keyword_ideas(
-            seed_keywords=seed_keywords,
-            location_name=target_location,
-            url=target_url if target_url else None,
-        )
-        
-        # Track DataForSEO spend
-        try:
-            from app.services.dataforseo import get_dataforseo_cost
-            dataforseo_cost = get_dataforseo_cost()
-            print(f"💰 DataForSEO cost tracked: ${dataforseo_cost:.4f}", flush=True)
-            user_ref.update({
-                "dataforseoSpend": gcfirestore.Increment(dataforseo_cost)
-            })
-        except Exception as e:
-            print(f"⚠️ Failed to track DataForSEO cost: {e}", flush=True)
-        
-        # Filter keywords based on intake data (negative keywords, excluded brands, location relevance)
-        try:
-            from app.services.dataforseo import filter_keywords_by_intake
-            negative_kws = intake.get("negative_keywords", "").strip()
-            excluded_brands = intake.get("excluded_brands", "").strip()
-            
-            print(f"\n📋 Applying multi-stage filters...")
-            raw_output = filter_keywords_by_intake(
-                keywords=raw_output,
-                negative_keywords=negative_kws if negative_kws else None,
-                excluded_brands=excluded_brands if excluded_brands else None,
-                location_name=target_location,  # Pass the target location for relevance filtering
-            )
-        except Exception as e:
-            print(f"⚠️ Local filtering failed: {e}", flush=True)
-            # Continue without filtering if it fails
-            
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"DataForSEO API failed: {str(e)}"
-        )
+    # An unknown location can't be sent to DataForSEO; reject it before charging
+    geo_id = await resolve_geo_id(target_location)
+    if not geo_id:
+        raise HTTPException(status_code=400, detail="Could not resolve location to a location code")
     
-    # 5. Run AI keyword filtering to produce structured results
-    try:
-        from app.services.keyword_ai_filter import run_keyword_ai_filter
-        structured = run_keyword_ai_filter(
-            intake=intake,
-            raw_output=raw_output,
-            user_id=userId,
-            research_id=intakeId,
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"AI keyword filtering failed: {str(e)}"
-        )
+    keyword_research_ref = _keyword_research_ref(client, userId, intakeId)
     
-    # 6. Save both raw and structured results to Firestore in ONE operation
-    # Path: intakes/{userId}/{intakeId}/keyword_research
-    try:
-        # DEBUG: Log what we're about to save
-        print(f"\n=== SAVING TO FIRESTORE ===")
-        print(f"User: {userId}, Intake: {intakeId}")
-        print(f"Raw keywords: {len(raw_output)}")
-        print(f"Primary: {len(structured.get('primary_keywords', []))}")
-        print(f"Secondary: {len(structured.get('secondary_keywords', []))}")
-        print(f"Long-tail: {len(structured.get('long_tail_keywords', []))}")
-        
-        # Log first 3 keywords from raw_output to see DataForSEO data
-        print(f"\n=== FIRST 3 RAW KEYWORDS FROM DATAFORSEO ===")
-        for idx, raw_kw in enumerate(raw_output[:3]):
-            print(f"[{idx}] {raw_kw.get('keyword')}: avg_monthly_searches={raw_kw.get('avg_monthly_searches')}, competition={raw_kw.get('competition')}")
-        
-        # Log first primary keyword with all fields
-        if structured.get("primary_keywords"):
-            pk = structured["primary_keywords"][0]
-            print(f"\n=== FIRST PRIMARY KEYWORD (FINAL FOR FIRESTORE) ===")
-            print(f"  keyword: {pk.get('keyword')}")
-            print(f"  search_volume: {pk.get('search_volume')} (type: {type(pk.get('search_volume'))})")
-            print(f"  competition: {pk.get('competition')}")
-            print(f"  competition_index: {pk.get('competition_index')}")
-            print(f"  low_bid: {pk.get('low_top_of_page_bid_micros')}")
-            print(f"  high_bid: {pk.get('high_top_of_page_bid_micros')}")
-            print(f"  trend_yoy: {pk.get('trend_yoy')}")
-            print(f"  Full object: {pk}")
-        
-        # Log first secondary keyword
-        if structured.get("secondary_keywords"):
-            sk = structured["secondary_keywords"][0]
-            print(f"\n=== FIRST SECONDARY KEYWORD ===")
-            print(f"  keyword: {sk.get('keyword')}")
-            print(f"  search_volume: {sk.get('search_volume')} (type: {type(sk.get('search_volume'))})")
-        
-        
-        keyword_research_ref = (
-            db.collection("intakes")
-            .document(userId)
-            .collection(intakeId)
-            .document("keyword_research")
-        )
-        
-        # Single write with all data - use merge=False to fully replace any stale data
-        keyword_research_ref.set({
-            # Structured results (for frontend display)
-            "primary_keywords": structured.get("primary_keywords", []),
-            "secondary_keywords": structured.get("secondary_keywords", []),
-            "long_tail_keywords": structured.get("long_tail_keywords", []),
-            # Raw data (for debugging and audit trail)
-            "raw_output": raw_output,
-            "raw_sample": raw_output[:10] if isinstance(raw_output, list) else [],
-            # Metadata
-            "status": "completed",
-            "geo_id": geo_id,
-            "target_location": target_location,
-            "seed_keywords_used": seed_keywords,
-            "createdAt": gcfirestore.SERVER_TIMESTAMP,
-            "metadata": {
-                "keyword_intent": intake.get("keyword_intent"),
-                "buyer_journey_stage": intake.get("buyer_journey_stage"),
-                "keyword_performance": intake.get("keyword_performance"),
-            }
-        }, merge=False)
-        
-        print(f"✅ Saved to Firestore successfully")
-    except Exception as e:
-        print(f"❌ Failed to save: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to save results to Firestore: {str(e)}"
-        )
-
-    # 7. Increment public stats counter
-    try:
-        db.collection("system").document("stats").update({
-            "searches_ran": gcfirestore.Increment(1)
-        })
-    except Exception:
-        pass  # Non-critical
+    job_id = uuid.uuid4().hex
+    research_summary = {
+        "jobId": job_id,
+        "target_location": target_location,
+        "seed_keywords_used": seed_keywords,
+        "createdAt": gcfirestore.SERVER_TIMESTAMP,
+        "metadata": {
+            "keyword_intent": intake.get("keyword_intent"),
+            "buyer_journey_stage": intake.get("buyer_journey_stage"),
+            "keyword_performance": intake.get("keyword_performance"),
+        }
+    }
+    
+    # Apply credit resets, check limits and deduct 1 credit in a single
+    # transaction so concurrent requests cannot both pass the credit check.
+    # The same commit replaces any previous results with a queued marker.
+    await asyncio.to_thread(
+        _consume_research_credit,
+        client.transaction(),
+        user_ref,
+        datetime.now(timezone.utc),
+        keyword_research_ref,
+        {**research_summary, "status": "queued"},
+    )
     
-    # 8. Return success response (final structured results are saved under research/{userId}/{intakeId})
+    background_tasks.add_task(
+        _run_keyword_research_pipeline,
+        client=client,
+        keyword_research_ref=keyword_research_ref,
+        user_ref=user_ref,
+        intake=intake,
+        intake_fields=intake_fields,
+        research_summary=research_summary,
+        geo_id=geo_id,
+        user_id=userId,
+        research_id=intakeId,
+    )
+
     return {
         "success": True,
-        "message": "Keyword research completed successfully",
-        "keywords_found": len(raw_output),
+        "status": "queued",
+        "job_id": job_id,
+        "message": "Keyword research queued; poll the keyword_research document for results",
         "userId": userId,
         "intakeId": intakeId,
-        "structured_saved": True
     }
 
 
+def _build_keyword_comparison(structured_keywords: dict, raw_output: list) -> list:
+    """One row per structured keyword comparing AI volume with raw Google volume."""
+    # Index raw keywords by lowercased text; first occurrence wins like the old linear scan
+    raw_index = {}
+    for item in raw_output:
+        raw_index.setdefault(item.get("keyword", "").lower(), item)
+    
+    # Category per structured keyword object
+    category_map = {}
+    for category in ("primary", "secondary", "long_tail"):
+        for kw in structured_keywords[f"{category}_keywords"]:
+            category_map.setdefault(id(kw), category)
+    
+    def row(kw: dict) -> dict:
+        google_match = raw_index.get(kw.get("keyword", "").lower())
+        google_volume = google_match.get("avg_monthly_searches") if google_match else None
+        ai_volume = kw.get("search_volume")
+        return {
+            "keyword": kw.get("keyword"),
+            "google_volume": google_volume,
+            "ai_volume": ai_volume,
+            "match": google_volume == ai_volume if google_volume is not None else None,
+            "category": category_map[id(kw)],
+        }
+    
+    # Walk the three lists in place
+    return [
+        row(kw)
+        for kw in chain(
+            structured_keywords["primary_keywords"],
+            structured_keywords["secondary_keywords"],
+            structured_keywords["long_tail_keywords"],
+        )
+    ]
+
+
 @router.get("/keyword-research/debug/{userId}/{intakeId}")
 async def debug_keyword_research(
     userId: str,
     intakeId: str,
-    authorization: str | None = Header(default=None)
+    user: tuple[str, DocumentReference] = Depends(current_user),
+    client: Client = Depends(firestore_client),
 ):
     """
     Debug endpoint to view raw Google Ads data vs AI-processed data.
     Returns both the raw Google API response and the final structured keywords.
     """
-    uid = get_uid(authorization)
+    uid, _ = user
     
     # Security check
     if uid != userId:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     # Fetch raw Google data
-    raw_ref = (
-        db.collection("intakes")
-        .document(userId)
-        .collection(intakeId)
-        .document("keyword_research")
-    )
-    raw_doc = raw_ref.get()
+    raw_ref = _keyword_research_ref(client, userId, intakeId)
+    raw_doc = await asyncio.to_thread(raw_ref.get)
     
     if not raw_doc.exists:
         raise HTTPException(status_code=404, detail="No keyword research found")
     
     raw_data = raw_doc.to_dict()
-    raw_output = raw_data.get("raw_output", [])
+    raw_output = await asyncio.to_thread(load_raw_output, raw_ref, raw_data)
     
     # Fetch processed/structured data
     structured_keywords = {
@@ -523,40 +823,14 @@ async def debug_keyword_research(
         "long_tail_keywords": raw_data.get("long_tail_keywords", []),
     }
     
-    # Build comparison report
-    comparison = []
-    all_structured = (
-        structured_keywords.get("primary_keywords", []) +
-        structured_keywords.get("secondary_keywords", []) +
-        structured_keywords.get("long_tail_keywords", [])
-    )
-    
-    for kw in all_structured:
-        keyword_text = kw.get("keyword", "").lower()
-        ai_volume = kw.get("search_volume")
-        
-        # Find matching keyword in raw Google data
-        google_match = next(
-            (item for item in raw_output if item.get("keyword", "").lower() == keyword_text),
-            None
-        )
-        
-        google_volume = google_match.get("avg_monthly_searches") if google_match else None
-        
-        comparison.append({
-            "keyword": kw.get("keyword"),
-            "google_volume": google_volume,
-            "ai_volume": ai_volume,
-            "match": google_volume == ai_volume if google_volume is not None else None,
-            "category": "primary" if kw in structured_keywords.get("primary_keywords", []) else 
-                       "secondary" if kw in structured_keywords.get("secondary_keywords", []) else "long_tail"
-        })
+    # Build comparison report off the event loop; it walks every raw and structured keyword
+    comparison = await asyncio.to_thread(_build_keyword_comparison, structured_keywords, raw_output)
     
     return {
         "userId": userId,
         "intakeId": intakeId,
         "total_google_keywords": len(raw_output),
-        "total_structured_keywords": len(all_structured),
+        "total_structured_keywords": len(comparison),
         "comparison": comparison,
         "raw_google_sample": raw_output[:10],  # First 10 for inspection
         "mismatches": [c for c in comparison if c.get("match") == False],
@@ -567,13 +841,14 @@ async def debug_keyword_research(
 async def delete_keyword_research(
     userId: str,
     intakeId: str,
-    authorization: str | None = Header(default=None)
+    user: tuple[str, DocumentReference] = Depends(current_user),
+    client: Client = Depends(firestore_client),
 ):
     """
     Delete keyword research data to allow re-running with fresh data.
     Useful for clearing stale cached results.
     """
-    uid = get_uid(authorization)
+    uid, _ = user
     
     # Security check
     if uid != userId:
@@ -581,13 +856,12 @@ async def delete_keyword_research(
     
     try:
         # Delete the keyword_research document
-        keyword_research_ref = (
-            db.collection("intakes")
-            .document(userId)
-            .collection(intakeId)
-            .document("keyword_research")
-        )
-        keyword_research_ref.delete()
+        keyword_research_ref = _keyword_research_ref(client, userId, intakeId)
+        # Drop the cached DataForSEO result too so a re-run fetches fresh data
+        doc = await asyncio.to_thread(keyword_research_ref.get)
+        if doc.exists:
+            invalidate_dfs_cache((doc.to_dict() or {}).get("dfs_cache_key"))
+        await asyncio.to_thread(delete_keyword_research_doc, keyword_research_ref, client=client)
         
         return {
             "success": True,
@@ -604,13 +878,14 @@ async def delete_keyword_research(
 async def reprocess_keyword_research(
     userId: str,
     intakeId: str,
-    authorization: str | None = Header(default=None)
+    user: tuple[str, DocumentReference] = Depends(current_user),
+    client: Client = Depends(firestore_client),
 ):
     """
     Re-run the AI filter on existing raw_output to fix stale data.
     Use this to update old research with new DataForSEO metrics without re-running the API.
     """
-    uid = get_uid(authorization)
+    uid, _ = user
     
     # Security check
     if uid != userId:
@@ -618,54 +893,59 @@ async def reprocess_keyword_research(
     
     try:
         # Get existing keyword_research document
-        keyword_research_ref = (
-            db.collection("intakes")
-            .document(userId)
-            .collection(intakeId)
-            .document("keyword_research")
+        keyword_research_ref = _keyword_research_ref(client, userId, intakeId)
+        intake_ref = client.collection("research_intakes").document(f"{userId}_{intakeId}")
+        doc, intake_doc = await asyncio.gather(
+            asyncio.to_thread(keyword_research_ref.get),
+            asyncio.to_thread(intake_ref.get),
         )
-        doc = keyword_research_ref.get()
         
         if not doc.exists:
             raise HTTPException(status_code=404, detail="No keyword research found")
         
         data = doc.to_dict()
-        raw_output = data.get("raw_output", [])
+        raw_output = await asyncio.to_thread(load_raw_output, keyword_research_ref, data)
         
         if not raw_output:
             raise HTTPException(status_code=400, detail="No raw_output data found to reprocess")
         
         # Get intake data
-        intake_doc_id = f"{userId}_{intakeId}"
-        intake_ref = db.collection("research_intakes").document(intake_doc_id)
-        intake_doc = intake_ref.get()
-        
         if not intake_doc.exists:
             raise HTTPException(status_code=404, detail="Intake not found")
         
         intake = intake_doc.to_dict()
         
         # Re-run AI filter
-        from app.services.keyword_ai_filter import run_keyword_ai_filter
-        structured = run_keyword_ai_filter(
+        structured = await asyncio.to_thread(
+            run_keyword_ai_filter,
             intake=intake,
             raw_output=raw_output,
             user_id=userId,
             research_id=intakeId,
         )
         
-        # Save updated structured data (merge=False to fully replace)
-        keyword_research_ref.set({
+        # Move legacy inline raw_output into raw_chunks
+        if "raw_output" in data:
+            raw_count = await asyncio.to_thread(save_raw_output, keyword_research_ref, raw_output, client=client)
+        else:
+            raw_count = data.get("raw_count", len(raw_output))
+        
+        # Save updated structured data (merge=False to fully replace stale fields
+        # such as inline raw_output or a previous error)
+        await asyncio.to_thread(keyword_research_ref.set, {
             "primary_keywords": structured.get("primary_keywords", []),
             "secondary_keywords": structured.get("secondary_keywords", []),
             "long_tail_keywords": structured.get("long_tail_keywords", []),
-            "raw_output": raw_output,
-            "raw_sample": raw_output[:10] if isinstance(raw_output, list) else [],
+            "raw_count": raw_count,
             "status": "completed",
             "geo_id": data.get("geo_id"),
             "target_location": data.get("target_location"),
             "seed_keywords_used": data.get("seed_keywords_used", []),
             "createdAt": data.get("createdAt"),
+            # Kept so the delete endpoint can still drop the cached DataForSEO
+            # result and pollers can still match the job
+            "dfs_cache_key": data.get("dfs_cache_key"),
+            "jobId": data.get("jobId"),
             "reprocessedAt": gcfirestore.SERVER_TIMESTAMP,
             "metadata": data.get("metadata", {}),
         }, merge=False)
@@ -1,196 +1,185 @@
-from fastapi import APIRouter, Depends, Query
-from app.services.firestore import db
-from app.utils.auth import verify_token
+import asyncio
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, Response
+from app.services.firestore import get_db
+from app.utils.auth import require_admin
 from google.cloud import firestore as gcfirestore
-from google.cloud.firestore_v1.base_query import FieldFilter
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+# Document references per get_all() call during a recount
+STATS_GET_ALL_CHUNK = 300
 
-@router.get("/public")
-async def get_public_stats(force_refresh: bool = Query(False)):
-    """Get public statistics for homepage display from stored counters."""
+# Homepage counters change slowly; serve them from memory for this long
+PUBLIC_STATS_TTL_SECONDS = 30
+_public_stats_cache: TTLCache = TTLCache(maxsize=1, ttl=PUBLIC_STATS_TTL_SECONDS)
+_public_stats_lock = asyncio.Lock()
+
+EMPTY_STATS = {
+    "searches_ran": 0,
+    "meta_tags_generated": 0,
+    "blog_ideas_created": 0,
+    "keywords_analyzed": 0,
+}
+
+# Latest system/stats pushed by the real-time listener; None until the first
+# snapshot arrives or while the listener is not running
+_live_stats: dict | None = None
+_stats_watch = None
+
+
+def _on_stats_snapshot(docs, changes, read_time):
+    global _live_stats
+    # Runs on the listener's thread; swapping the module-level dict is atomic
+    if docs and docs[0].exists:
+        stats_data = docs[0].to_dict() or {}
+        _live_stats = {key: stats_data.get(key, 0) for key in EMPTY_STATS}
+    else:
+        # Document missing: let /public fall back to a direct read
+        _live_stats = None
+
+
+def _live_stats_if_current() -> dict | None:
+    """The listener's copy of system/stats, or None when it can't be trusted.
+
+    Watch streams stop for good on an unrecoverable error without calling the
+    snapshot callback, so the last snapshot would otherwise be served forever.
+    """
+    global _live_stats
+    live = _live_stats
+    if live is None:
+        return None
+    watch = _stats_watch
+    if watch is None or not watch.is_active:
+        # Listener stopped or died; fall back to the cached direct read
+        _live_stats = None
+        return None
+    return live
+
+
+def start_stats_listener():
+    """Subscribe to system/stats so /public serves counters without a Firestore read."""
+    global _stats_watch
+    if _stats_watch is not None:
+        return
     try:
-        # Simply read the pre-calculated stats from a single document
-        stats_doc = db.collection("system").document("stats").get()
-        
-        # Force refresh if requested or if baseline numbers detected
-        should_refresh = force_refresh
-        
-        if stats_doc.exists and not force_refresh:
-            stats_data = stats_doc.to_dict()
-            
-            # Check if this looks like fake baseline data
-            if (stats_data.get("searches_ran") == 100 and 
-                stats_data.get("meta_tags_generated") == 250 and
-                stats_data.get("blog_ideas_created") == 500 and
-                stats_data.get("keywords_analyzed") == 1500):
-                
-                should_refresh = True
-                print("⚠️ Detected baseline numbers, forcing recount...")
-            else:
-                # Return existing real data
-                print(f"✅ Returning existing stats: {stats_data}")
-                return {
-                    "searches_ran": stats_data.get("searches_ran", 0),
-                    "meta_tags_generated": stats_data.get("meta_tags_generated", 0),
-                    "blog_ideas_created": stats_data.get("blog_ideas_created", 0),
-                    "keywords_analyzed": stats_data.get("keywords_analyzed", 0),
-                }
-        else:
-            should_refresh = True
-        
-        if should_refresh:
-            # Delete old stats if exists
-            if stats_doc.exists:
-                print("🗑️ Deleting old stats document...")
-                db.collection("system").document("stats").delete()
-            
-            # Initialize with real counts
-            print("🔄 Counting real data from database...")
-            
-            try:
-                # Count existing data
-                research_intakes_list = list(db.collection("research_intakes").stream())
-                searches_count = len(research_intakes_list)
-                print(f"📊 Found {searches_count} total searches")
-                
-                meta_tags_count = 0
-                blog_ideas_count = 0
-                keywords_analyzed_count = 0
-                
-                for research_doc in research_intakes_list:
-                    doc_id = research_doc.id
-                    if "_" in doc_id:
-                        parts = doc_id.split("_", 1)
-                        if len(parts) == 2:
-                            user_id, research_id = parts
-                            
-                            try:
-                                meta_doc = db.collection("intakes").document(user_id).collection(research_id).document("meta_tags").get()
-                                if meta_doc.exists:
-                                    meta_tags_count += 1
-                                
-                                blog_doc = db.collection("intakes").document(user_id).collection(research_id).document("blog_ideas").get()
-                                if blog_doc.exists:
-                                    blog_data = blog_doc.to_dict()
-                                    if blog_data and "blog_ideas" in blog_data:
-                                        blog_ideas_count += len(blog_data["blog_ideas"])
-                                
-                                keywords_doc = db.collection("intakes").document(user_id).collection(research_id).document("keyword_research").get()
-                                if keywords_doc.exists:
-                                    kw_data = keywords_doc.to_dict()
-                                    if kw_data:
-                                        keywords_analyzed_count += (
-                                            len(kw_data.get("primary_keywords", [])) +
-                                            len(kw_data.get("secondary_keywords", [])) +
-                                            len(kw_data.get("long_tail_keywords", []))
-                                        )
-                            except Exception as e:
-                                print(f"Error counting for {research_id}: {e}")
-                                pass
-                
-                print(f"📈 Real counts - Searches: {searches_count}, Meta: {meta_tags_count}, Blogs: {blog_ideas_count}, Keywords: {keywords_analyzed_count}")
-                
-                initial_stats = {
-                    "searches_ran": searches_count,
-                    "meta_tags_generated": meta_tags_count,
-                    "blog_ideas_created": blog_ideas_count,
-                    "keywords_analyzed": keywords_analyzed_count,
-                    "last_updated": gcfirestore.SERVER_TIMESTAMP,
-                }
-                
-                db.collection("system").document("stats").set(initial_stats)
-                print(f"✅ Initialized stats with real data: {initial_stats}")
-                return {
-                    "searches_ran": searches_count,
-                    "meta_tags_generated": meta_tags_count,
-                    "blog_ideas_created": blog_ideas_count,
-                    "keywords_analyzed": keywords_analyzed_count,
-                }
-                
-            except Exception as e:
-                print(f"❌ Error during initialization: {e}")
-                # Return zeros if initialization fails
-                return {
-                    "searches_ran": 0,
-                    "meta_tags_generated": 0,
-                    "blog_ideas_created": 0,
-                    "keywords_analyzed": 0,
-                }
-            
+        _stats_watch = get_db().collection("system").document("stats").on_snapshot(_on_stats_snapshot)
     except Exception as e:
-        print(f"❌ Error fetching stats: {e}")
-        return {
-            "searches_ran": 0,
-            "meta_tags_generated": 0,
-            "blog_ideas_created": 0,
-            "keywords_analyzed": 0,
-        }
+        print(f"❌ Error starting stats listener: {e}")
 
 
-@router.post("/initialize")
-async def initialize_stats(token_data: dict = Depends(verify_token)):
-    """Initialize stats by counting existing data. Admin only."""
+def stop_stats_listener():
+    global _stats_watch, _live_stats
+    if _stats_watch is not None:
+        _stats_watch.unsubscribe()
+        _stats_watch = None
+    _live_stats = None
+
+
+def _count_research_intakes() -> int:
+    """Server-side count() aggregation; one RPC, no documents transferred."""
+    return get_db().collection("research_intakes").count().get()[0][0].value
+
+
+def _read_public_stats() -> dict:
+    stats_doc = get_db().collection("system").document("stats").get()
+    if not stats_doc.exists:
+        # Counters have never been initialized; searches can still be counted cheaply
+        return {**EMPTY_STATS, "searches_ran": _count_research_intakes()}
+
+    stats_data = stats_doc.to_dict() or {}
+    return {key: stats_data.get(key, 0) for key in EMPTY_STATS}
+
+
+@router.get("/public")
+async def get_public_stats(response: Response):
+    """Get public statistics for homepage display from stored counters.
+
+    Counters in system/stats are kept current with Increment() by the write
+    paths (searches, meta tags, blog ideas, keyword research). Recounting
+    from scratch is the admin-only /stats/initialize job.
+
+    Served from the real-time listener's copy when it has one, otherwise
+    from a short per-process cache; browsers and CDNs may cache too.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={PUBLIC_STATS_TTL_SECONDS}"
+
+    live = _live_stats_if_current()
+    if live is not None:
+        return live
+
+    cached = _public_stats_cache.get("stats")
+    if cached is not None:
+        return cached
+
+    # Only one request per process refreshes; the rest wait and reuse its result
+    async with _public_stats_lock:
+        cached = _public_stats_cache.get("stats")
+        if cached is not None:
+            return cached
+        try:
+            stats = await asyncio.to_thread(_read_public_stats)
+        except Exception as e:
+            print(f"❌ Error fetching stats: {e}")
+            return dict(EMPTY_STATS)
+        _public_stats_cache["stats"] = stats
+        return stats
+
+
+def _recount_stats():
+    """Recount all stats from stored research data and overwrite system/stats."""
     try:
         print("Starting stats initialization...")
+        client = get_db()
         
-        # Count total research intakes (searches ran)
-        research_intakes_list = list(db.collection("research_intakes").stream())
-        searches_count = len(research_intakes_list)
-        print(f"Found {searches_count} research intakes")
+        counts = {"meta_tags": 0, "blog_ideas": 0, "keyword_research": 0}
         
-        # Count meta tags, blog ideas, and keywords
-        meta_tags_count = 0
-        blog_ideas_count = 0
-        keywords_analyzed_count = 0
+        def fold(refs):
+            # Batched read instead of three sequential get() calls per research
+            try:
+                for doc in client.get_all(refs):
+                    if not doc.exists:
+                        continue
+                    if doc.id == "meta_tags":
+                        counts["meta_tags"] += 1
+                        continue
+                    data = doc.to_dict() or {}
+                    if doc.id == "blog_ideas":
+                        counts["blog_ideas"] += len(data.get("blog_ideas") or [])
+                    elif doc.id == "keyword_research":
+                        counts["keyword_research"] += (
+                            len(data.get("primary_keywords", [])) +
+                            len(data.get("secondary_keywords", [])) +
+                            len(data.get("long_tail_keywords", []))
+                        )
+            except Exception as e:
+                print(f"  Error reading {len(refs)} research documents: {e}")
+        
+        # Single pass over research intakes: only document names are needed
+        # (empty projection), and nested reads are issued as each chunk fills
+        intakes_col = client.collection("intakes")
+        searches_count = 0
+        pending = []
+        for research_doc in client.collection("research_intakes").select([]).stream():
+            searches_count += 1
+            user_id, sep, research_id = research_doc.id.partition("_")
+            if sep and user_id and research_id:
+                research_col = intakes_col.document(user_id).collection(research_id)
+                pending.extend((
+                    research_col.document("meta_tags"),
+                    research_col.document("blog_ideas"),
+                    research_col.document("keyword_research"),
+                ))
+                if len(pending) >= STATS_GET_ALL_CHUNK:
+                    fold(pending)
+                    pending = []
+        if pending:
+            fold(pending)
+        print(f"Found {searches_count} research intakes")
         
-        # Iterate through research intakes to count generated content
-        for research_doc in research_intakes_list:
-            doc_id = research_doc.id
-            print(f"Processing research: {doc_id}")
-            
-            if "_" in doc_id:
-                parts = doc_id.split("_", 1)
-                if len(parts) == 2:
-                    user_id, research_id = parts
-                    
-                    # Check for meta_tags
-                    try:
-                        meta_doc = db.collection("intakes").document(user_id).collection(research_id).document("meta_tags").get()
-                        if meta_doc.exists:
-                            meta_tags_count += 1
-                            print(f"  Found meta tags for {research_id}")
-                    except Exception as e:
-                        print(f"  Error checking meta tags: {e}")
-                    
-                    # Check for blog_ideas and count individual ideas
-                    try:
-                        blog_doc = db.collection("intakes").document(user_id).collection(research_id).document("blog_ideas").get()
-                        if blog_doc.exists:
-                            blog_data = blog_doc.to_dict()
-                            if blog_data and "blog_ideas" in blog_data:
-                                ideas_count = len(blog_data["blog_ideas"])
-                                blog_ideas_count += ideas_count
-                                print(f"  Found {ideas_count} blog ideas for {research_id}")
-                    except Exception as e:
-                        print(f"  Error checking blog ideas: {e}")
-                    
-                    # Check for keyword_research and count keywords
-                    try:
-                        keywords_doc = db.collection("intakes").document(user_id).collection(research_id).document("keyword_research").get()
-                        if keywords_doc.exists:
-                            kw_data = keywords_doc.to_dict()
-                            if kw_data:
-                                kw_count = (
-                                    len(kw_data.get("primary_keywords", [])) +
-                                    len(kw_data.get("secondary_keywords", [])) +
-                                    len(kw_data.get("long_tail_keywords", []))
-                                )
-                                keywords_analyzed_count += kw_count
-                                print(f"  Found {kw_count} keywords for {research_id}")
-                    except Exception as e:
-                        print(f"  Error checking keywords: {e}")
+        meta_tags_count = counts["meta_tags"]
+        blog_ideas_count = counts["blog_ideas"]
+        keywords_analyzed_count = counts["keyword_research"]
         
         # Save to system/stats document
         stats_data = {
@@ -202,17 +191,24 @@ async def initialize_stats(token_data: dict = Depends(verify_token)):
         }
         
         print(f"Final stats: {stats_data}")
-        db.collection("system").document("stats").set(stats_data)
-        
-        return {
-            "success": True,
-            "message": "Stats initialized successfully",
-            "stats": stats_data
-        }
+        client.collection("system").document("stats").set(stats_data)
         
     except Exception as e:
         print(f"Error initializing stats: {e}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
+
+
+@router.post("/initialize")
+async def initialize_stats(
+    background_tasks: BackgroundTasks,
+    token_data: dict = Depends(require_admin),
+):
+    """Recount stats from existing data. Admin only.
+
+    The recount scans every research intake, so it runs as a background
+    task; the result lands in system/stats when it finishes.
+    """
+    background_tasks.add_task(_recount_stats)
+    return {
+        "success": True,
+        "message": "Stats recount started",
+    }
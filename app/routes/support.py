@@ -1,66 +1,84 @@
-from fastapi import APIRouter, HTTPException, Header
+import asyncio
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from google.cloud import firestore as gcfirestore
+from google.cloud.firestore import Query as FirestoreQuery
 from app.services.firestore import db
-import firebase_admin
-from firebase_admin import auth as firebase_auth
-from datetime import datetime
-import uuid
+from app.schemas.support import IssueReportRequest
+from app.utils.auth import verify_bearer_token
 
-router = APIRouter(prefix="/support", tags=["support"])
+
+def _validation_detail(exc: RequestValidationError) -> str:
+    """Same messages the hand-written checks returned before the request models."""
+    for error in exc.errors():
+        field = str(error.get("loc", ("",))[-1])
+        if error.get("type") == "string_too_long" and field in ("title", "description"):
+            max_length = (error.get("ctx") or {}).get("max_length")
+            return f"{field.capitalize()} must be {max_length} characters or less"
+        if field in ("title", "description") or error.get("loc", ("",))[0] == "body":
+            return "Title and description are required"
+    return "Invalid request"
+
+
+class _BadRequestRoute(APIRoute):
+    """Report validation failures as 400, as this router's clients expect."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            try:
+                return await handler(request)
+            except RequestValidationError as exc:
+                raise HTTPException(status_code=400, detail=_validation_detail(exc))
+
+        return route_handler
+
+
+router = APIRouter(prefix="/support", tags=["support"], route_class=_BadRequestRoute)
+
+# Most issues returned by one /my-issues call
+MY_ISSUES_PAGE_SIZE = 100
+# Fields listed by /my-issues; the description stays on the server
+MY_ISSUES_FIELDS = ["issueId", "title", "status", "createdAt"]
+
+# Encoded /my-issues bodies per uid, keyed within the entry by (limit, start_after).
+# Dropped when the user reports a new issue. Only touched from the event
+# loop, so no lock is needed.
+MY_ISSUES_CACHE_TTL_SECONDS = 10
+_issues_cache: TTLCache = TTLCache(maxsize=5000, ttl=MY_ISSUES_CACHE_TTL_SECONDS)
 
 
 # ----------------------------------------
 # REPORT AN ISSUE
 # ----------------------------------------
 @router.post("/report-issue")
-def report_issue(body: dict, authorization: str | None = Header(default=None)):
+async def report_issue(body: IssueReportRequest, decoded: dict = Depends(verify_bearer_token)):
     """
     Allow users to report bugs, issues, or feature requests.
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
-
     try:
-        decoded = firebase_auth.verify_id_token(token)
         uid = decoded["uid"]
         email = decoded.get("email", "unknown")
 
-        title = body.get("title", "").strip()
-        description = body.get("description", "").strip()
-
-        if not title or not description:
-            raise HTTPException(status_code=400, detail="Title and description are required")
-
-        if len(title) > 200:
-            raise HTTPException(status_code=400, detail="Title must be 200 characters or less")
-
-        if len(description) > 5000:
-            raise HTTPException(status_code=400, detail="Description must be 5000 characters or less")
-
-        # Create issue report in Firestore
-        issue_id = str(uuid.uuid4())
-        
-        issues_ref = db.collection("support_issues").document(issue_id)
-        issues_ref.set({
+        # Create issue report in Firestore under an auto-generated id
+        # Single document per issue; /my-issues queries this collection by userId
+        issues_ref = db.collection("support_issues").document()
+        issue_id = issues_ref.id
+        await asyncio.to_thread(issues_ref.set, {
             "issueId": issue_id,
             "userId": uid,
             "userEmail": email,
-            "title": title,
-            "description": description,
-            "status": "open",
-            "createdAt": datetime.utcnow().isoformat(),
-            "updatedAt": datetime.utcnow().isoformat()
-        })
-
-        # Also save a reference under the user's issues subcollection for easy retrieval
-        user_issues_ref = db.collection("users").document(uid).collection("issues").document(issue_id)
-        user_issues_ref.set({
-            "issueId": issue_id,
-            "title": title,
+            "title": body.title,
+            "description": body.description,
             "status": "open",
-            "createdAt": datetime.utcnow().isoformat()
+            "createdAt": gcfirestore.SERVER_TIMESTAMP,
+            "updatedAt": gcfirestore.SERVER_TIMESTAMP
         })
+        _issues_cache.pop(uid, None)
 
         return {
             "status": "submitted",
@@ -78,35 +96,61 @@ def report_issue(body: dict, authorization: str | None = Header(default=None)):
 # GET USER'S ISSUE REPORTS
 # ----------------------------------------
 @router.get("/my-issues")
-def get_user_issues(authorization: str | None = Header(default=None)):
+async def get_user_issues(
+    decoded: dict = Depends(verify_bearer_token),
+    limit: int = Query(default=MY_ISSUES_PAGE_SIZE, ge=1, le=MY_ISSUES_PAGE_SIZE),
+    start_after: str | None = Query(default=None),
+):
     """
-    Get all issue reports submitted by the current user.
-    """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-
-    token = authorization.split(" ")[1]
+    Get issue reports submitted by the current user, newest first.
 
+    Returns up to `limit` issues. Pass the returned `next_cursor` as
+    `start_after` to fetch the next page.
+    """
     try:
-        decoded = firebase_auth.verify_id_token(token)
         uid = decoded["uid"]
 
-        # Get user's issues from their subcollection
-        user_issues = db.collection("users").document(uid).collection("issues").stream()
+        page_key = (limit, start_after)
+        cached_pages = _issues_cache.get(uid)
+        if cached_pages is not None and page_key in cached_pages:
+            return Response(content=cached_pages[page_key], media_type="application/json")
+
+        # Get user's issues, sorted and limited by Firestore
+        # (composite index support_issues: userId ASC, createdAt DESC)
+        issues_col = db.collection("support_issues")
+        query = (
+            issues_col.where("userId", "==", uid)
+            .select(MY_ISSUES_FIELDS)
+            .order_by("createdAt", direction=FirestoreQuery.DESCENDING)
+            .limit(limit)
+        )
+        if start_after:
+            cursor_doc = await asyncio.to_thread(issues_col.document(start_after).get)
+            if not cursor_doc.exists or cursor_doc.get("userId") != uid:
+                raise HTTPException(status_code=400, detail="Invalid start_after cursor")
+            query = query.start_after(cursor_doc)
+        user_issues = await asyncio.to_thread(query.get)
         
         issues = []
         for doc in user_issues:
             issue_data = doc.to_dict()
             issue_data["issueId"] = doc.id
+            # Server timestamps come back as datetimes; send ISO strings as before
+            created_at = issue_data.get("createdAt")
+            if hasattr(created_at, "isoformat"):
+                issue_data["createdAt"] = created_at.isoformat()
             issues.append(issue_data)
 
-        # Sort by creation date (newest first)
-        issues.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
-
-        return {
+        # Encode once; cache hits send these bytes without re-serializing
+        body = orjson.dumps({
             "issues": issues,
-            "total": len(issues)
-        }
+            "total": len(issues),
+            "next_cursor": issues[-1]["issueId"] if len(issues) == limit else None,
+        })
+        if cached_pages is None:
+            cached_pages = _issues_cache[uid] = {}
+        cached_pages[page_key] = body
+        return Response(content=body, media_type="application/json")
 
     except HTTPException:
         raise
@@ -0,0 +1,42 @@
+# app/schemas/content.py
+# Strict response schemas for structured-output generations. Shapes mirror the
+# OUTPUT FORMAT sections of the matching prompts in app/utils.
+
+from pydantic import BaseModel
+from typing import List
+
+
+class BlogIdea(BaseModel):
+    title: str
+    target_keyword: str
+    search_intent: str
+    why_this_topic: str
+
+
+class BlogIdeasSchema(BaseModel):
+    blog_ideas: List[BlogIdea]
+
+
+class PageTitleVariation(BaseModel):
+    title: str
+    primary_keyword_used: str
+    characters: int
+    region_inserted: bool
+
+
+class MetaDescriptionVariation(BaseModel):
+    description: str
+    keyword_used: str
+    characters: int
+
+
+class MetaTagsNotes(BaseModel):
+    primary_keyword_used: str
+    secondary_keywords_used: List[str]
+    long_tail_keywords_used: List[str]
+
+
+class MetaTagsSchema(BaseModel):
+    page_title_variations: List[PageTitleVariation]
+    meta_description_variations: List[MetaDescriptionVariation]
+    notes: MetaTagsNotes
@@ -1,28 +1,52 @@
 # app/schemas/seo.py
 
-from pydantic import BaseModel
-from typing import Any, List, Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict
+from typing import Annotated, Any, Dict, List, Optional
+
+
+def _normalize_terms(values: List[str]) -> List[str]:
+    """Lowercase, drop blanks and duplicates, keep first-seen order."""
+    return list(dict.fromkeys(v.strip().lower() for v in values if v.strip()))
+
+
+def _dedupe_texts(values: List[str]) -> List[str]:
+    """Drop blanks and case-insensitive duplicates, keeping the first spelling."""
+    seen = {}
+    for v in values:
+        text = v.strip()
+        if text:
+            seen.setdefault(text.lower(), text)
+    return list(seen.values())
+
+
+# Keyword-like lists are matched case-insensitively downstream
+TermList = Annotated[List[str], AfterValidator(_normalize_terms)]
+TextList = Annotated[List[str], AfterValidator(_dedupe_texts)]
 
 
 class Location(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
     country: str
     city: Optional[str] = None
     region: Optional[str] = None
 
 
 class SEOIntakeRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
     platform: str
     target_page_url: str
     location: Location
     service_or_topic: str
 
-    suggested_keywords: List[str] = []
-    negative_keywords: List[str] = []
-    excluded_brands: List[str] = []
-    competitors: List[str] = []
+    suggested_keywords: TermList = []
+    negative_keywords: TermList = []
+    excluded_brands: TermList = []
+    competitors: TermList = []
 
     keyword_intent: Optional[str] = None
-    common_questions: List[str] = []
+    common_questions: TextList = []
 
     target_audience: Optional[str] = None
     page_type: Optional[str] = None
@@ -30,6 +54,18 @@ class SEOIntakeRequest(BaseModel):
     competition_preference: Optional[str] = None
 
 
+class GoogleAdsKeyword(BaseModel):
+    """One row of dataforseo.fetch_keyword_ideas output."""
+    keyword: str
+    avg_monthly_searches: Optional[int] = None
+    competition: Optional[str] = None
+    competition_index: Optional[int] = None
+    low_top_of_page_bid_micros: Optional[int] = None
+    high_top_of_page_bid_micros: Optional[int] = None
+    yoy_change: Optional[float] = None
+    monthly_searches: List[Dict[str, Any]] = []
+
+
 class SEOResponse(BaseModel):
     seo_report: Any
-    google_ads_keywords: List[Any]
+    google_ads_keywords: List[GoogleAdsKeyword]
@@ -0,0 +1,10 @@
+# app/schemas/support.py
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class IssueReportRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    title: str = Field(min_length=1, max_length=200)
+    description: str = Field(min_length=1, max_length=5000)
@@ -1,5 +1,15 @@
 import os
+import re
+import asyncio
 import json
+import time
+import hashlib
+import logging
+import threading
+import orjson
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List
 from app.services.firestore import db
 from google.cloud import firestore as gcfirestore
@@ -12,19 +22,68 @@ from app.utils.google_ads_landing_page_prompt import GOOGLE_ADS_LANDING_PAGE_PRO
 from app.utils.google_ads_negative_keywords_prompt import GOOGLE_ADS_NEGATIVE_KEYWORDS_PROMPT
 from app.utils.google_ads_structure_prompt import GOOGLE_ADS_STRUCTURE_PROMPT
 from app.utils.cost_calculator import calculate_openai_cost
+from app.schemas.content import BlogIdeasSchema, MetaTagsSchema
+from app.services import openai_limiter, stats_counter
+
+logger = logging.getLogger(__name__)
 
 # Lazy initialize OpenAI client
 _client = None
 
+# Runs independent OpenAI calls (e.g. meta tags next to page content) side by side
+_generation_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CONTENT_GENERATION_WORKERS", "8")),
+    thread_name_prefix="content-gen",
+)
+
+# Non-critical Firestore writes (usage metrics, public counters) that shouldn't
+# hold up returning the generated content
+_background_writes = ThreadPoolExecutor(max_workers=2, thread_name_prefix="content-metrics")
+
+
+def _write_in_background(write, *args, **kwargs):
+    """Run a non-critical Firestore write off the response path; failures are logged, not raised."""
+    def run():
+        try:
+            write(*args, **kwargs)
+        except Exception:
+            logger.exception("Background Firestore write failed")
+    _background_writes.submit(run)
+
 def get_openai_client():
-    """Get or create OpenAI client (lazy initialization)."""
+    """Get or create OpenAI client (lazy initialization).
+
+    The client keeps one pooled HTTP/2 connection set to the API, so calls
+    made side by side (e.g. meta tags next to page content) reuse warm
+    connections instead of each paying for a TLS handshake.
+    """
     global _client
     if _client is None:
+        import httpx
         from openai import OpenAI
-        _client = OpenAI()
+        pool_size = int(os.getenv("OPENAI_HTTP_POOL_SIZE", "50"))
+        _client = OpenAI(
+            # The SDK retries 429s, timeouts and 5xx with exponential backoff,
+            # honouring Retry-After
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "3")),
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                # Long page drafts stream for minutes; only connecting is kept short
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            )
+        )
     return _client
 
 
+def close_openai_client():
+    """Close the pooled OpenAI connections (called on shutdown)."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
 def _json_default(o):
     """JSON serializer for datetime objects."""
     if hasattr(o, "isoformat"):
@@ -35,8 +94,69 @@ def _json_default(o):
     return str(o)
 
 
+# OPENAI_MODEL overrides the Firestore setting; read once at import
+_ENV_MODEL = os.getenv("OPENAI_MODEL")
+
+# The model setting rarely changes; reuse it for this long between reads
+MODEL_SETTING_TTL_SECONDS = 60
+_model_cache = {"value": None, "expires": 0.0}
+
+
+def _prompt_json(obj: Any) -> str:
+    """Pretty-printed JSON for embedding in prompts (orjson, non-ASCII kept as-is)."""
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2).decode()
+
+
+# Both prompt placeholders, filled in a single pass over the template
+_PROMPT_PLACEHOLDER_RE = re.compile(r"\{(user_intake_form|final_keywords)\}")
+
+
+def _fill_prompt(template: str, intake_json: str, keywords_json: str) -> str:
+    """Substitute {user_intake_form} and {final_keywords} in one scan of the template."""
+    values = {"user_intake_form": intake_json, "final_keywords": keywords_json}
+    return _PROMPT_PLACEHOLDER_RE.sub(lambda m: values[m.group(1)], template)
+
+
+def _kw_text(kws) -> str:
+    """Comma-separated keyword text from keyword dicts or plain strings."""
+    return ", ".join(k.get("keyword", "") if isinstance(k, dict) else str(k) for k in kws if k)
+
+
+# Markdown link to an absolute URL, e.g. [text](https://...)
+_MD_LINK_RE = re.compile(r'\[[^\]]+\]\([^)]*https?://')
+
+# Runs of 1-4 capitalized words (likely the topic); anchor for the blog link fallback
+_CAP_PATTERN = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b')
+
+
+def _add_wikipedia_link(text: str, kw_pattern, wiki_term: str, allow_capitalized: bool = True):
+    """Link the first keyword match in text to Wikipedia, else (optionally) the first capitalized phrase.
+
+    Keyword matches link to the wiki_term article, capitalized phrases to their own.
+    Returns (text, anchor); anchor is None when nothing was linked.
+    """
+    match = kw_pattern.search(text) if kw_pattern else None
+    if match:
+        article = wiki_term
+    elif allow_capitalized:
+        match = _CAP_PATTERN.search(text)
+        article = match.group(1) if match else ""
+    if not match:
+        return text, None
+    anchor = match.group(1)
+    wikipedia_url = f"https://en.wikipedia.org/wiki/{article.replace(' ', '_')}"
+    return f"{text[:match.start()]}[{anchor}]({wikipedia_url}){text[match.end():]}", anchor
+
+
 def _get_model_from_settings():
-    """Get OpenAI model from Firestore settings or use default."""
+    """Get OpenAI model from Firestore settings or use default.
+
+    Cached for MODEL_SETTING_TTL_SECONDS; the admin model endpoint clears it.
+    """
+    now = time.monotonic()
+    if now < _model_cache["expires"]:
+        return _model_cache["value"]
+
     model = "gpt-4o-mini"
     try:
         settings_ref = db.collection("system_settings").document("openai")
@@ -46,23 +166,270 @@ def _get_model_from_settings():
             model = settings_data.get("model", "gpt-4o-mini")
     except Exception:
         pass
+    _model_cache.update(value=model, expires=now + MODEL_SETTING_TTL_SECONDS)
     return model
 
 
-def _update_user_metrics(user_id: str, token_usage: dict, cost: float, model: str):
-    """Update user token usage and spending."""
+def invalidate_model_setting_cache():
+    """Make the next generation re-read the model setting."""
+    _model_cache["expires"] = 0.0
+
+
+def _create_completion(**kwargs):
+    """chat.completions.create, throttled to the process's RPM/TPM budget."""
+    openai_limiter.acquire(kwargs["messages"])
+    return get_openai_client().chat.completions.create(**kwargs)
+
+
+def _stream_chat_completion(**kwargs):
+    """Run a chat completion as a stream and collect it.
+
+    Returns (content, usage). Tokens are read as they are generated instead of
+    in one body at the end, so long drafts keep the connection active and the
+    text is assembled while the model is still writing.
+    """
+    stream = _create_completion(
+        stream=True,
+        stream_options={"include_usage": True},
+        **kwargs,
+    )
+    parts = []
+    usage = None
+    got_choices = False
+    for chunk in stream:
+        # Usage arrives on the final chunk, which has no choices
+        if chunk.usage:
+            usage = chunk.usage
+        if chunk.choices:
+            got_choices = True
+            parts.append(chunk.choices[0].delta.content or "")
+    if not got_choices:
+        raise RuntimeError("OpenAI returned no choices")
+    return "".join(parts), usage
+
+
+def _parse_completion(request: dict, response_model):
+    """chat.completions.parse with a strict schema; None if the model doesn't support it."""
+    from openai import BadRequestError
+    openai_limiter.acquire(request["messages"])
     try:
-        user_ref = db.collection("users").document(user_id)
-        user_ref.update({
-            "tokenUsage": gcfirestore.Increment(token_usage.get("total_tokens", 0)),
-            "promptTokens": gcfirestore.Increment(token_usage.get("prompt_tokens", 0)),
-            "completionTokens": gcfirestore.Increment(token_usage.get("completion_tokens", 0)),
-            "model": model,
-            "totalSpend": gcfirestore.Increment(cost),
-            "lastActivity": gcfirestore.SERVER_TIMESTAMP,
-        })
+        return get_openai_client().chat.completions.parse(response_format=response_model, **request)
+    except BadRequestError as e:
+        # Only a model without json_schema support falls back; other 400s are real errors
+        message = str(e).lower()
+        if getattr(e, "param", None) != "response_format" and "json_schema" not in message and "response_format" not in message:
+            raise
+        logger.warning("Structured outputs unavailable for %s, using JSON mode: %s", request["model"], e)
+        return None
+
+
+# Exact-match cache for deterministic (temperature 0) generations: the same model
+# and messages give the same output, so a repeat skips OpenAI entirely. Entries
+# live in Firestore (llm_cache, shared by all workers; expire via expiresAt) with
+# a small in-process copy in front. Values are stored as JSON bytes so every hit
+# hands out fresh objects.
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+_llm_cache: TTLCache = TTLCache(maxsize=256, ttl=LLM_CACHE_TTL_SECONDS)
+_llm_cache_lock = threading.Lock()
+
+
+def _llm_cache_key(request: dict) -> str:
+    return hashlib.sha256(
+        orjson.dumps([request["model"], request["temperature"], request["messages"]])
+    ).hexdigest()
+
+
+def _llm_cache_get(key: str):
+    """Cached result_json for key, or None."""
+    with _llm_cache_lock:
+        cached = _llm_cache.get(key)
+    if cached is None:
+        try:
+            doc = db.collection("llm_cache").document(key).get()
+        except Exception:
+            return None  # Cache is best-effort
+        data = doc.to_dict() if doc.exists else None
+        if not data or data.get("expiresAt", datetime.min.replace(tzinfo=timezone.utc)) <= datetime.now(timezone.utc):
+            return None
+        cached = data["result"].encode()
+        with _llm_cache_lock:
+            _llm_cache[key] = cached
+    return orjson.loads(cached)
+
+
+def _llm_cache_put(key: str, model: str, result_json: Dict[str, Any]) -> None:
+    encoded = orjson.dumps(result_json)
+    with _llm_cache_lock:
+        _llm_cache[key] = encoded
+    _write_in_background(db.collection("llm_cache").document(key).set, {
+        # JSON string: generator output can have keys Firestore won't store as fields
+        "result": encoded.decode(),
+        "model": model,
+        "createdAt": gcfirestore.SERVER_TIMESTAMP,
+        "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=LLM_CACHE_TTL_SECONDS),
+    })
+
+
+def _run_generation(
+    prompt: str,
+    system_content: str,
+    *,
+    temperature: float = 0,
+    stream: bool = False,
+    response_model=None,
+    cache: bool = False,
+):
+    """Run one JSON-mode generation.
+
+    With a response_model (pydantic), the request uses structured outputs and
+    the SDK's parsed object is used directly; models without structured-output
+    support fall back to JSON mode.
+
+    With cache=True (temperature 0 only), an identical earlier request is
+    answered from the LLM cache with zero token usage and cost.
+
+    Returns (result_json, token_usage, cost, model); token_usage includes
+    estimated_cost_usd. Raises RuntimeError if the request fails and
+    ValueError if the model returns invalid JSON.
+    """
+    model = _ENV_MODEL or _get_model_from_settings()
+    request = dict(
+        model=model,
+        temperature=temperature,
+        messages=[
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": prompt},
+        ],
+    )
+    
+    cache_key = _llm_cache_key(request) if cache and temperature == 0 else None
+    if cache_key:
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            logger.info("LLM cache hit (%s)", model)
+            token_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "estimated_cost_usd": 0.0}
+            return cached, token_usage, 0.0, model
+    
+    parsed = None
+    try:
+        if stream:
+            content, usage = _stream_chat_completion(response_format={"type": "json_object"}, **request)
+        else:
+            response = _parse_completion(request, response_model) if response_model is not None else None
+            if response is None:
+                response = _create_completion(response_format={"type": "json_object"}, **request)
+            if not response.choices:
+                raise RuntimeError("OpenAI returned no choices")
+            message = response.choices[0].message
+            parsed = getattr(message, "parsed", None)
+            content, usage = message.content or "", response.usage
+    except RuntimeError:
+        raise
     except Exception as e:
-        pass  # Silently fail - metrics are non-critical
+        raise RuntimeError(f"OpenAI API request failed: {e}")
+    
+    # Extract token usage and calculate cost
+    token_usage = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) if usage else 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) if usage else 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) if usage else 0,
+    }
+    
+    cost = calculate_openai_cost(
+        prompt_tokens=token_usage["prompt_tokens"],
+        completion_tokens=token_usage["completion_tokens"],
+        model=model
+    )
+    token_usage["estimated_cost_usd"] = cost
+    
+    if parsed is not None:
+        result_json = parsed.model_dump()
+    else:
+        try:
+            result_json = orjson.loads(content)
+        except json.JSONDecodeError as e:
+            snippet = content[:300]
+            raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
+    
+    if cache_key:
+        _llm_cache_put(cache_key, model, result_json)
+    
+    return result_json, token_usage, cost, model
+
+
+def _final_keywords(keywords: Dict[str, Any]) -> Dict[str, Any]:
+    """The four keyword lists as embedded in prompts."""
+    return {
+        "primary_keywords": keywords.get("primary_keywords", []),
+        "secondary_keywords": keywords.get("secondary_keywords", []),
+        "long_tail_keywords": keywords.get("long_tail_keywords", []),
+        "deleted_keywords": keywords.get("deleted_keywords", []),
+    }
+
+
+def _save_ads_result(
+    doc_name: str,
+    result_json: Dict[str, Any],
+    token_usage: dict,
+    cost: float,
+    model: str,
+    user_id: str,
+    research_id: str,
+    batch=None,
+) -> Dict[str, Any]:
+    """Save a Google Ads generator result under the research and return the response payload.
+
+    With a batch, the document and metrics writes are queued on it for the
+    caller to commit.
+    """
+    doc_ref = (
+        db.collection("intakes")
+        .document(user_id)
+        .collection(research_id)
+        .document(doc_name)
+    )
+    
+    firestore_payload = {
+        **result_json,
+        "token_usage": token_usage,
+        "status": "completed",
+        "createdAt": gcfirestore.SERVER_TIMESTAMP,
+    }
+    
+    if batch is not None:
+        batch.set(doc_ref, firestore_payload)
+        _update_user_metrics(user_id, token_usage, cost, model, batch=batch)
+    else:
+        doc_ref.set(firestore_payload)
+        _update_user_metrics(user_id, token_usage, cost, model)
+    
+    return {
+        **result_json,
+        "token_usage": token_usage,
+        "status": "completed",
+    }
+
+
+def _update_user_metrics(user_id: str, token_usage: dict, cost: float, model: str, batch=None):
+    """Update user token usage and spending.
+
+    With a batch, the update is queued on it instead of sent on its own.
+    Callers only generate for existing users, so the update can't fail the
+    commit on a missing document. Without a batch, it is sent in the background.
+    """
+    user_ref = db.collection("users").document(user_id)
+    metrics = {
+        "tokenUsage": gcfirestore.Increment(token_usage.get("total_tokens", 0)),
+        "promptTokens": gcfirestore.Increment(token_usage.get("prompt_tokens", 0)),
+        "completionTokens": gcfirestore.Increment(token_usage.get("completion_tokens", 0)),
+        "model": model,
+        "totalSpend": gcfirestore.Increment(cost),
+        "lastActivity": gcfirestore.SERVER_TIMESTAMP,
+    }
+    if batch is not None:
+        batch.update(user_ref, metrics)
+        return
+    _write_in_background(user_ref.update, metrics)
 
 
 def generate_blog_ideas(
@@ -95,66 +462,19 @@ def generate_blog_ideas(
         }
     
     # Format keywords for the prompt
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
+    final_keywords = _final_keywords(keywords)
     
-    prompt = BLOG_IDEAS_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
+    prompt = _fill_prompt(BLOG_IDEAS_PROMPT, _prompt_json(intake), _prompt_json(final_keywords))
     # Provide explicit guidance about deleted keywords
     if final_keywords.get("deleted_keywords"):
         prompt += "\n\nNOTE: The following keywords were explicitly removed by the user. Treat them as context only—do NOT target them directly unless essential for coherence. Removed Keywords: " + \
-            ", ".join([k.get("keyword", "") if isinstance(k, dict) else str(k) for k in final_keywords["deleted_keywords"] if k])
-    
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert SEO content strategist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
+            _kw_text(final_keywords["deleted_keywords"])
     
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    # Extract token usage and calculate cost
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
-    
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert SEO content strategist. Always return strictly valid JSON.",
+        response_model=BlogIdeasSchema,
     )
-    token_usage["estimated_cost_usd"] = cost
-    
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
     
     # Save to Firestore if research_id is provided
     if research_id:
@@ -176,13 +496,8 @@ def generate_blog_ideas(
         doc_ref.set(firestore_payload)
         
         # Update public stats counter
-        try:
-            blog_count = len(result_json.get("blog_ideas", []))
-            db.collection("system").document("stats").update({
-                "blog_ideas_created": gcfirestore.Increment(blog_count)
-            })
-        except Exception:
-            pass  # Non-critical
+        blog_count = len(result_json.get("blog_ideas", []))
+        stats_counter.increment("blog_ideas_created", blog_count)
     
     # Update user metrics
     _update_user_metrics(user_id, token_usage, cost, model)
@@ -206,12 +521,19 @@ def generate_meta_tags(
     long_tail_keywords: List[str] = None,
     user_intake_form: Dict[str, Any] = None,
     research_data: Dict[str, Any] = None,
+    intake_json: str = None,
+    batch=None,
 ) -> Dict[str, Any]:
     """Generate meta tags based on intake form and final keywords.
     
     Can be called in two ways:
     1. Old: intake, keywords, user_id, research_id (from GET endpoint)
     2. New: primary_keywords, secondary_keywords, long_tail_keywords, user_intake_form, user_id (from POST endpoint)
+    
+    intake_json: the intake already serialized with _prompt_json, to skip doing it again.
+    batch: queue the meta tags doc on this batch; the caller commits it and bumps
+    the stats counter. The token usage is recorded straight away, as it is spent
+    whether or not the caller ends up committing.
     """
     
     # Handle new POST endpoint calling style
@@ -225,65 +547,21 @@ def generate_meta_tags(
         }
     
     # Format keywords for the prompt
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
+    final_keywords = _final_keywords(keywords)
     
-    prompt = META_TAGS_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
+    prompt = _fill_prompt(META_TAGS_PROMPT, intake_json or _prompt_json(intake), _prompt_json(final_keywords))
     if final_keywords.get("deleted_keywords"):
         prompt += "\n\nDO NOT optimize for these removed keywords directly: " + \
-            ", ".join([k.get("keyword", "") if isinstance(k, dict) else str(k) for k in final_keywords["deleted_keywords"] if k])
-    
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert SEO metadata strategist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
+            _kw_text(final_keywords["deleted_keywords"])
     
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    # Extract token usage and calculate cost
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
-    
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model="gpt-4o-mini"
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert SEO metadata strategist. Always return strictly valid JSON.",
+        response_model=MetaTagsSchema,
     )
-    token_usage["estimated_cost_usd"] = cost
     
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
+    # Meta tags doc and user metrics go out in one commit
+    write_batch = batch if batch is not None else db.batch()
     
     # Save to Firestore if research_id is provided
     if research_id:
@@ -304,18 +582,18 @@ def generate_meta_tags(
             "createdAt": gcfirestore.SERVER_TIMESTAMP,
         }
         
-        doc_ref.set(firestore_payload)
-        
-        # Update public stats counter
-        try:
-            db.collection("system").document("stats").update({
-                "meta_tags_generated": gcfirestore.Increment(1)
-            })
-        except Exception:
-            pass  # Non-critical
+        write_batch.set(doc_ref, firestore_payload)
     
     # Update user metrics
-    _update_user_metrics(user_id, token_usage, cost, model)
+    if batch is None:
+        _update_user_metrics(user_id, token_usage, cost, model, batch=write_batch)
+        write_batch.commit()
+        
+        # Update public stats counter
+        if research_id:
+            stats_counter.increment("meta_tags_generated")
+    else:
+        _update_user_metrics(user_id, token_usage, cost, model)
     
     # Return payload without SERVER_TIMESTAMP sentinel
     return {
@@ -327,6 +605,54 @@ def generate_meta_tags(
     }
 
 
+# Attempts per item in the *_many helpers, on top of the OpenAI SDK's own retries
+GENERATE_MANY_ATTEMPTS = 3
+
+
+def _is_transient_openai_error(exc: BaseException) -> bool:
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    return isinstance(exc, (APIConnectionError, InternalServerError, RateLimitError))
+
+
+async def _generate_many(generate, items: List[Dict[str, Any]], concurrency: int) -> List[Any]:
+    """Run a sync generator over many keyword-argument dicts, at most `concurrency` at a time.
+
+    Results come back in input order. An item that hits a rate limit or a
+    transient API error is retried with backoff; one that still fails yields
+    its exception instead of failing the whole run.
+    """
+    from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    def run(kwargs):
+        for attempt in Retrying(
+            retry=retry_if_exception(_is_transient_openai_error),
+            stop=stop_after_attempt(GENERATE_MANY_ATTEMPTS),
+            wait=wait_random_exponential(multiplier=1, max=20),
+            reraise=True,
+        ):
+            with attempt:
+                return generate(**kwargs)
+
+    async def one(kwargs):
+        async with semaphore:
+            return await loop.run_in_executor(_generation_executor, run, kwargs)
+
+    return await asyncio.gather(*(one(kwargs) for kwargs in items), return_exceptions=True)
+
+
+async def generate_meta_tags_many(items: List[Dict[str, Any]], concurrency: int = 10) -> List[Any]:
+    """generate_meta_tags for each item (its keyword arguments), in parallel."""
+    return await _generate_many(generate_meta_tags, items, concurrency)
+
+
+async def generate_blog_ideas_many(items: List[Dict[str, Any]], concurrency: int = 10) -> List[Any]:
+    """generate_blog_ideas for each item (its keyword arguments), in parallel."""
+    return await _generate_many(generate_blog_ideas, items, concurrency)
+
+
 def generate_page_content(
     *,
     intake: Dict[str, Any] = None,
@@ -357,12 +683,7 @@ def generate_page_content(
         }
     
     # Format keywords for the prompt
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []) if keywords else [],
-        "secondary_keywords": keywords.get("secondary_keywords", []) if keywords else [],
-        "long_tail_keywords": keywords.get("long_tail_keywords", []) if keywords else [],
-        "deleted_keywords": keywords.get("deleted_keywords", []) if keywords else [],
-    }
+    final_keywords = _final_keywords(keywords or {})
     
     # Check if this is a blog post - use dedicated blog prompt
     is_blog_post = (
@@ -372,161 +693,94 @@ def generate_page_content(
     )
     
     selected_prompt = BLOG_DRAFT_PROMPT if is_blog_post else CONTENT_PROMPT
+    # Serialized once; the meta tags prompt embeds the same intake
+    intake_json = _prompt_json(intake)
     
-    prompt = selected_prompt.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
+    prompt = _fill_prompt(selected_prompt, intake_json, _prompt_json(final_keywords))
     if final_keywords.get("deleted_keywords"):
         prompt += "\n\nAvoid focusing on removed keywords; treat them only as context: " + \
-            ", ".join([k.get("keyword", "") if isinstance(k, dict) else str(k) for k in final_keywords["deleted_keywords"] if k])
-    
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert SEO content strategist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
-    
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    # Extract token usage and calculate cost
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
+            _kw_text(final_keywords["deleted_keywords"])
     
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
+    meta_tags_kwargs = dict(
+        primary_keywords=primary_keywords or (keywords.get("primary_keywords", []) if keywords else []),
+        secondary_keywords=secondary_keywords or (keywords.get("secondary_keywords", []) if keywords else []),
+        long_tail_keywords=long_tail_keywords or (keywords.get("long_tail_keywords", []) if keywords else []),
+        user_intake_form=intake,
+        user_id=user_id,
+        research_id=research_id,
+        intake_json=intake_json,
+    )
+    # Meta tags doc, page content and the content's metrics go out in one
+    # commit, made only once the content has been generated (the meta tags
+    # call records its own usage as soon as it finishes)
+    write_batch = db.batch()
+    meta_tags_generated = False
+    
+    # Regular pages take their meta tags from the meta tags generator; that request
+    # doesn't depend on the page content, so it runs while the content request is
+    # in flight. Its writes wait on write_batch, which this thread leaves alone
+    # until the future is done. Blog drafts carry their own title/description, so
+    # for blogs the meta tags call is only made afterwards if the draft lacks them.
+    meta_tags_future = None if is_blog_post else _generation_executor.submit(
+        generate_meta_tags, **meta_tags_kwargs, batch=write_batch
     )
-    token_usage["estimated_cost_usd"] = cost
     
-    content = response.choices[0].message.content
+    # Page drafts are the longest responses; stream them in
     try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
+        result_json, token_usage, cost, model = _run_generation(
+            prompt,
+            "You are an expert SEO content strategist. Always return strictly valid JSON.",
+            stream=True,
+        )
+    except Exception:
+        # Nothing is committed; skip the meta tags request if it hasn't started.
+        # If it has, it still records its token usage when it finishes.
+        if meta_tags_future is not None:
+            meta_tags_future.cancel()
+        raise
     
     # Validate external link is present if this is a blog post
     if is_blog_post:
-        has_external_link = False
-        
-        # Check intro for external link
-        if "intro" in result_json and result_json["intro"]:
-            intro_content = result_json["intro"]
-            if "[" in intro_content and "](" in intro_content and "http" in intro_content:
-                has_external_link = True
-        
-        # Check sections for external link
-        if not has_external_link and "sections" in result_json and isinstance(result_json["sections"], list):
-            for section in result_json["sections"]:
-                section_content = section.get("content", "")
-                # Check for markdown link pattern [text](url)
-                if "[" in section_content and "](" in section_content and "http" in section_content:
-                    has_external_link = True
-                    break
+        # Check intro, then sections, for a markdown link pattern [text](url)
+        sections = result_json.get("sections")
+        has_external_link = bool(_MD_LINK_RE.search(result_json.get("intro") or "")) or (
+            isinstance(sections, list)
+            and any(
+                _MD_LINK_RE.search(section.get("content") or "")
+                for section in sections
+                if isinstance(section, dict)
+            )
+        )
         
         if not has_external_link:
             print(f"[WARNING] Blog post missing external link - attempting to add one intelligently")
-            # Find appropriate anchor text in the intro and convert it to a link
-            import re
-            link_added = False
+            # Try to find the first occurrence of the primary keyword or a related term
+            # and make that a Wikipedia link; compiled once for intro and first section
+            primary_kw = primary_keywords[0] if primary_keywords else ""
+            pattern = re.compile(r'\b(' + re.escape(primary_kw) + r')\b', re.IGNORECASE) if primary_kw else None
             
-            if "intro" in result_json and result_json["intro"]:
-                intro = result_json["intro"]
-                
-                # Try to find the first occurrence of the primary keyword or a related term
-                # and make that a Wikipedia link
-                primary_kw = primary_keywords[0] if primary_keywords else ""
-                
-                # Look for the keyword (case-insensitive)
-                if primary_kw:
-                    # Try exact match first
-                    pattern = re.compile(r'\b(' + re.escape(primary_kw) + r')\b', re.IGNORECASE)
-                    match = pattern.search(intro)
-                    
-                    if match:
-                        # Found the keyword - replace first occurrence with link
-                        matched_text = match.group(1)
-                        # Convert to title case for better Wikipedia URL
-                        wiki_term = primary_kw.title()
-                        wikipedia_url = f"https://en.wikipedia.org/wiki/{wiki_term.replace(' ', '_')}"
-                        intro_with_link = pattern.sub(f"[{matched_text}]({wikipedia_url})", intro, count=1)
-                        result_json["intro"] = intro_with_link
-                        link_added = True
-                        print(f"[INFO] Added Wikipedia link to '{matched_text}' in intro")
-                
-                if not link_added:
-                    # Fallback: find first noun phrase or capitalize words (likely topic)
-                    # Look for sequences of 1-4 capitalized words
-                    cap_pattern = re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,3})\b')
-                    cap_match = cap_pattern.search(intro)
-                    
-                    if cap_match:
-                        anchor_text = cap_match.group(1)
-                        wikipedia_url = f"https://en.wikipedia.org/wiki/{anchor_text.replace(' ', '_')}"
-                        intro_with_link = intro.replace(anchor_text, f"[{anchor_text}]({wikipedia_url})", 1)
-                        result_json["intro"] = intro_with_link
-                        link_added = True
-                        print(f"[INFO] Added Wikipedia link to '{anchor_text}' in intro")
+            # Intro first (keyword, then a capitalized phrase), then the keyword in the first section
+            targets = []
+            if result_json.get("intro"):
+                targets.append((result_json, "intro", "intro", True))
+            sections = result_json.get("sections")
+            if isinstance(sections, list) and sections and isinstance(sections[0], dict) and sections[0].get("content"):
+                targets.append((sections[0], "content", "first section", False))
             
-            # If still no link added, try to add it to the first section
-            if not link_added and "sections" in result_json and isinstance(result_json["sections"], list) and len(result_json["sections"]) > 0:
-                first_section = result_json["sections"][0]
-                section_content = first_section.get("content", "")
-                
-                primary_kw = primary_keywords[0] if primary_keywords else ""
-                if primary_kw and section_content:
-                    pattern = re.compile(r'\b(' + re.escape(primary_kw) + r')\b', re.IGNORECASE)
-                    match = pattern.search(section_content)
-                    
-                    if match:
-                        matched_text = match.group(1)
-                        wiki_term = primary_kw.title()
-                        wikipedia_url = f"https://en.wikipedia.org/wiki/{wiki_term.replace(' ', '_')}"
-                        section_with_link = pattern.sub(f"[{matched_text}]({wikipedia_url})", section_content, count=1)
-                        result_json["sections"][0]["content"] = section_with_link
-                        link_added = True
-                        print(f"[INFO] Added Wikipedia link to '{matched_text}' in first section")
+            link_added = False
+            for container, key, where, allow_capitalized in targets:
+                new_text, anchor = _add_wikipedia_link(container[key], pattern, primary_kw.title(), allow_capitalized)
+                if anchor:
+                    container[key] = new_text
+                    link_added = True
+                    print(f"[INFO] Added Wikipedia link to '{anchor}' in {where}")
+                    break
             
             # Absolute last resort: add generic link to intro
-            if not link_added:
-                if "intro" in result_json and result_json["intro"]:
-                    result_json["intro"] += " [Learn more on Wikipedia](https://en.wikipedia.org)."
-                    print(f"[INFO] Added generic Wikipedia link as last resort")
+            if not link_added and result_json.get("intro"):
+                result_json["intro"] += " [Learn more on Wikipedia](https://en.wikipedia.org)."
+                print(f"[INFO] Added generic Wikipedia link as last resort")
     
-    # Update user metrics
-    _update_user_metrics(user_id, token_usage, cost, model)
-    
-    # Generate meta tags (fallback only; primary source is blog prompt)
-    meta_tags_result = generate_meta_tags(
-        primary_keywords=primary_keywords or (keywords.get("primary_keywords", []) if keywords else []),
-        secondary_keywords=secondary_keywords or (keywords.get("secondary_keywords", []) if keywords else []),
-        long_tail_keywords=long_tail_keywords or (keywords.get("long_tail_keywords", []) if keywords else []),
-        user_intake_form=intake,
-        user_id=user_id,
-        research_id=research_id,
-    )
-
     # Prefer blog-prompt title/description; fallback to meta tags if absent (ONLY for blog posts)
     if is_blog_post:
         page_title_variations = result_json.get("page_title_variations") or []
@@ -535,21 +789,50 @@ def generate_page_content(
                 page_title_variations = [{"title": result_json.get("page_title") }]
             elif result_json.get("h1"):
                 page_title_variations = [{"title": result_json.get("h1") }]
-        if not page_title_variations:
-            page_title_variations = meta_tags_result.get("page_title_variations", [])
 
         meta_description_variations = result_json.get("meta_description_variations") or []
         if not meta_description_variations and result_json.get("meta_description"):
             meta_description_variations = [{"description": result_json.get("meta_description") }]
         if not meta_description_variations and result_json.get("intro"):
             meta_description_variations = [{"description": result_json.get("intro") }]
+
+        # Second OpenAI round-trip only when the draft left a gap
+        if page_title_variations and meta_description_variations:
+            meta_tags_result = {}
+        else:
+            print(f"[INFO] Blog draft missing title/description - generating meta tags")
+            meta_tags_result = generate_meta_tags(**meta_tags_kwargs, batch=write_batch)
+            meta_tags_generated = True
+        if not page_title_variations:
+            page_title_variations = meta_tags_result.get("page_title_variations", [])
         if not meta_description_variations:
             meta_description_variations = meta_tags_result.get("meta_description_variations", [])
     else:
+        # Meta tags started before the content request
+        meta_tags_result = meta_tags_future.result()
+        meta_tags_generated = True
         # For regular page content, use ONLY meta-tags generator output
         page_title_variations = meta_tags_result.get("page_title_variations", [])
         meta_description_variations = meta_tags_result.get("meta_description_variations", [])
     
+    # Built once for both the Firestore doc and the response: content from the
+    # draft; blogs also keep the draft's own page_title/meta_description, while
+    # regular content's variations come from the meta-tags generator (above)
+    page_content = {
+        "h1": result_json.get("h1", ""),
+        "intro": result_json.get("intro", ""),
+        "sections": result_json.get("sections", []),
+        "faq": result_json.get("faq", []),
+        "cta": result_json.get("cta", ""),
+    }
+    if is_blog_post:
+        page_content["page_title"] = result_json.get("page_title", "")
+        page_content["meta_description"] = result_json.get("meta_description", "")
+    page_content["page_title_variations"] = page_title_variations
+    page_content["meta_description_variations"] = meta_description_variations
+    page_content["token_usage"] = token_usage
+    page_content["status"] = "completed"
+    
     # Save to Firestore if research_id is provided
     if research_id:
         doc_ref = (
@@ -558,70 +841,17 @@ def generate_page_content(
             .collection(research_id)
             .document("page_content")
         )
-        
-        # For blogs, include blog-generated SEO fields; for regular content, use meta-tags only
-        if is_blog_post:
-            firestore_payload = {
-                "h1": result_json.get("h1", ""),
-                "intro": result_json.get("intro", ""),
-                "sections": result_json.get("sections", []),
-                "faq": result_json.get("faq", []),
-                "cta": result_json.get("cta", ""),
-                "page_title": result_json.get("page_title", ""),
-                "meta_description": result_json.get("meta_description", ""),
-                "page_title_variations": page_title_variations,
-                "meta_description_variations": meta_description_variations,
-                "token_usage": token_usage,
-                "status": "completed",
-                "createdAt": gcfirestore.SERVER_TIMESTAMP,
-            }
-        else:
-            # Regular page content uses meta-tags generator output
-            firestore_payload = {
-                "h1": result_json.get("h1", ""),
-                "intro": result_json.get("intro", ""),
-                "sections": result_json.get("sections", []),
-                "faq": result_json.get("faq", []),
-                "cta": result_json.get("cta", ""),
-                "page_title_variations": meta_tags_result.get("page_title_variations", []),
-                "meta_description_variations": meta_tags_result.get("meta_description_variations", []),
-                "token_usage": token_usage,
-                "status": "completed",
-                "createdAt": gcfirestore.SERVER_TIMESTAMP,
-            }
-        
-        doc_ref.set(firestore_payload)
+        write_batch.set(doc_ref, {**page_content, "createdAt": gcfirestore.SERVER_TIMESTAMP})
     
-    # Return payload: blogs get blog-generated SEO fields, regular content uses meta-tags
-    if is_blog_post:
-        return {
-            "h1": result_json.get("h1", ""),
-            "intro": result_json.get("intro", ""),
-            "sections": result_json.get("sections", []),
-            "faq": result_json.get("faq", []),
-            "cta": result_json.get("cta", ""),
-            "page_title": result_json.get("page_title", ""),
-            "meta_description": result_json.get("meta_description", ""),
-            "page_title_variations": page_title_variations,
-            "meta_description_variations": meta_description_variations,
-            "meta_notes": meta_tags_result.get("notes", {}),
-            "token_usage": token_usage,
-            "status": "completed",
-        }
-    else:
-        # Regular page content: content from CONTENT_PROMPT, titles/descriptions from meta-tags
-        return {
-            "h1": result_json.get("h1", ""),
-            "intro": result_json.get("intro", ""),
-            "sections": result_json.get("sections", []),
-            "faq": result_json.get("faq", []),
-            "cta": result_json.get("cta", ""),
-            "page_title_variations": meta_tags_result.get("page_title_variations", []),
-            "meta_description_variations": meta_tags_result.get("meta_description_variations", []),
-            "meta_notes": meta_tags_result.get("notes", {}),
-            "token_usage": token_usage,
-            "status": "completed",
-        }
+    _update_user_metrics(user_id, token_usage, cost, model, batch=write_batch)
+    write_batch.commit()
+    
+    if meta_tags_generated and research_id:
+        stats_counter.increment("meta_tags_generated")
+    
+    # Return payload without SERVER_TIMESTAMP sentinel
+    page_content["meta_notes"] = meta_tags_result.get("notes", {})
+    return page_content
 
 
 def generate_google_ads_ad_copy(
@@ -634,88 +864,17 @@ def generate_google_ads_ad_copy(
     """Generate Google Ads ad copy based on intake form and final keywords."""
     
     # Format keywords for the prompt
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
-    
-    prompt = GOOGLE_ADS_AD_COPY_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
-    
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0.3,  # Slightly higher for creative ad copy
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert Google Ads copywriter. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
-    
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
+    final_keywords = _final_keywords(keywords)
     
-    # Extract token usage and calculate cost
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
+    prompt = _fill_prompt(GOOGLE_ADS_AD_COPY_PROMPT, _prompt_json(intake), _prompt_json(final_keywords))
     
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert Google Ads copywriter. Always return strictly valid JSON.",
+        temperature=0.3,  # Slightly higher for creative ad copy
     )
-    token_usage["estimated_cost_usd"] = cost
     
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
-    
-    # Save to Firestore
-    doc_ref = (
-        db.collection("intakes")
-        .document(user_id)
-        .collection(research_id)
-        .document("ad_copy")
-    )
-    
-    firestore_payload = {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-        "createdAt": gcfirestore.SERVER_TIMESTAMP,
-    }
-    
-    doc_ref.set(firestore_payload)
-    
-    # Update user metrics
-    _update_user_metrics(user_id, token_usage, cost, model)
-    
-    return {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-    }
+    return _save_ads_result("ad_copy", result_json, token_usage, cost, model, user_id, research_id)
 
 
 def generate_google_ads_landing_page(
@@ -724,87 +883,21 @@ def generate_google_ads_landing_page(
     keywords: Dict[str, List[Dict[str, Any]]],
     user_id: str,
     research_id: str,
+    batch=None,
 ) -> Dict[str, Any]:
     """Generate Google Ads landing page recommendations."""
     
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
-    
-    prompt = GOOGLE_ADS_LANDING_PAGE_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
-    
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert landing page optimization specialist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
-    
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
-    
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
-    )
-    token_usage["estimated_cost_usd"] = cost
+    final_keywords = _final_keywords(keywords)
     
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
+    prompt = _fill_prompt(GOOGLE_ADS_LANDING_PAGE_PROMPT, _prompt_json(intake), _prompt_json(final_keywords))
     
-    doc_ref = (
-        db.collection("intakes")
-        .document(user_id)
-        .collection(research_id)
-        .document("landing_page")
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert landing page optimization specialist. Always return strictly valid JSON.",
+        cache=True,
     )
     
-    firestore_payload = {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-        "createdAt": gcfirestore.SERVER_TIMESTAMP,
-    }
-    
-    doc_ref.set(firestore_payload)
-    _update_user_metrics(user_id, token_usage, cost, model)
-    
-    return {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-    }
+    return _save_ads_result("landing_page", result_json, token_usage, cost, model, user_id, research_id, batch=batch)
 
 
 def generate_google_ads_negative_keywords(
@@ -813,87 +906,21 @@ def generate_google_ads_negative_keywords(
     keywords: Dict[str, List[Dict[str, Any]]],
     user_id: str,
     research_id: str,
+    batch=None,
 ) -> Dict[str, Any]:
     """Generate negative keyword recommendations for Google Ads."""
     
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
-    
-    prompt = GOOGLE_ADS_NEGATIVE_KEYWORDS_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
+    final_keywords = _final_keywords(keywords)
     
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
+    prompt = _fill_prompt(GOOGLE_ADS_NEGATIVE_KEYWORDS_PROMPT, _prompt_json(intake), _prompt_json(final_keywords))
     
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert Google Ads negative keyword strategist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
-    
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
-    
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
-    )
-    token_usage["estimated_cost_usd"] = cost
-    
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
-    
-    doc_ref = (
-        db.collection("intakes")
-        .document(user_id)
-        .collection(research_id)
-        .document("negative_keywords")
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert Google Ads negative keyword strategist. Always return strictly valid JSON.",
+        cache=True,
     )
     
-    firestore_payload = {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-        "createdAt": gcfirestore.SERVER_TIMESTAMP,
-    }
-    
-    doc_ref.set(firestore_payload)
-    _update_user_metrics(user_id, token_usage, cost, model)
-    
-    return {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-    }
+    return _save_ads_result("negative_keywords", result_json, token_usage, cost, model, user_id, research_id, batch=batch)
 
 def generate_google_ads_structure(
     *,
@@ -901,84 +928,50 @@ def generate_google_ads_structure(
     keywords: Dict[str, List[Dict[str, Any]]],
     user_id: str,
     research_id: str,
+    batch=None,
 ) -> Dict[str, Any]:
     """Generate Google Ads campaign structure."""
     
-    final_keywords = {
-        "primary_keywords": keywords.get("primary_keywords", []),
-        "secondary_keywords": keywords.get("secondary_keywords", []),
-        "long_tail_keywords": keywords.get("long_tail_keywords", []),
-        "deleted_keywords": keywords.get("deleted_keywords", []),
-    }
+    final_keywords = _final_keywords(keywords)
     
-    prompt = GOOGLE_ADS_STRUCTURE_PROMPT.replace(
-        "{user_intake_form}",
-        json.dumps(intake, ensure_ascii=False, indent=2, default=_json_default),
-    ).replace(
-        "{final_keywords}",
-        json.dumps(final_keywords, ensure_ascii=False, indent=2, default=_json_default),
-    )
+    prompt = _fill_prompt(GOOGLE_ADS_STRUCTURE_PROMPT, _prompt_json(intake), _prompt_json(final_keywords))
     
-    model = os.getenv("OPENAI_MODEL") or _get_model_from_settings()
-    
-    try:
-        response = get_openai_client().chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert Google Ads campaign strategist. Always return strictly valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
-    except Exception as e:
-        raise RuntimeError(f"OpenAI API request failed: {e}")
-    
-    if not response.choices:
-        raise RuntimeError("OpenAI returned no choices")
-    
-    token_usage = {
-        "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) if response.usage else 0,
-        "completion_tokens": getattr(response.usage, "completion_tokens", 0) if response.usage else 0,
-        "total_tokens": getattr(response.usage, "total_tokens", 0) if response.usage else 0,
-    }
-    
-    cost = calculate_openai_cost(
-        prompt_tokens=token_usage["prompt_tokens"],
-        completion_tokens=token_usage["completion_tokens"],
-        model=model
+    result_json, token_usage, cost, model = _run_generation(
+        prompt,
+        "You are an expert Google Ads campaign strategist. Always return strictly valid JSON.",
+        cache=True,
     )
-    token_usage["estimated_cost_usd"] = cost
     
-    content = response.choices[0].message.content
-    try:
-        result_json = json.loads(content)
-    except json.JSONDecodeError as e:
-        snippet = content[:300]
-        raise ValueError(f"Invalid JSON from model: {e}: {snippet}")
-    
-    doc_ref = (
-        db.collection("intakes")
-        .document(user_id)
-        .collection(research_id)
-        .document("structure")
+    return _save_ads_result("structure", result_json, token_usage, cost, model, user_id, research_id, batch=batch)
+
+
+async def generate_all_google_ads(
+    *,
+    intake: Dict[str, Any],
+    keywords: Dict[str, List[Dict[str, Any]]],
+    user_id: str,
+    research_id: str,
+) -> Dict[str, Any]:
+    """Generate landing page, negative keywords and campaign structure concurrently.
+
+    The three requests are independent, so the total wait is roughly the
+    slowest one instead of the sum. Their documents and metrics are saved in
+    one batch commit once all three have succeeded. Returns the three results
+    keyed by their Firestore document names.
+    """
+    # WriteBatch.set only appends to the batch's write list, so the worker
+    # threads can queue onto the same batch
+    write_batch = db.batch()
+    kwargs = dict(intake=intake, keywords=keywords, user_id=user_id, research_id=research_id, batch=write_batch)
+    landing_page, negative_keywords, structure = await asyncio.gather(
+        asyncio.to_thread(generate_google_ads_landing_page, **kwargs),
+        asyncio.to_thread(generate_google_ads_negative_keywords, **kwargs),
+        asyncio.to_thread(generate_google_ads_structure, **kwargs),
     )
-    
-    firestore_payload = {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
-        "createdAt": gcfirestore.SERVER_TIMESTAMP,
-    }
-    
-    doc_ref.set(firestore_payload)
-    _update_user_metrics(user_id, token_usage, cost, model)
-    
+    # 3 documents + 3 user metrics updates, well under the 500-write batch limit
+    await asyncio.to_thread(write_batch.commit)
     return {
-        **result_json,
-        "token_usage": token_usage,
-        "status": "completed",
+        "landing_page": landing_page,
+        "negative_keywords": negative_keywords,
+        "structure": structure,
     }
@@ -1,9 +1,14 @@
 import os
+import re
 import time
 import base64
 import requests
 import logging
-from typing import List, Dict, Optional
+import threading
+from requests.adapters import HTTPAdapter
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator, Optional
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -12,10 +17,22 @@ logger = logging.getLogger(__name__)
 _raw_base = os.getenv("DATAFORSEO_API_BASE", "https://api.dataforseo.com/v3")
 API_BASE = _raw_base.rstrip("/").replace("v3)", "v3")  # Fix common typo
 
-# Track actual costs from DataForSEO API responses
-_last_step1_cost = 0.0
-_last_step2_cost = 0.0
-_last_total_cost = 0.0
+# One keep-alive connection pool shared by every DataForSEO call, so
+# concurrent research runs reuse TLS connections instead of opening one per request.
+# Sized to cover the routes' DataForSEO concurrency limit (DFS_MAX_INFLIGHT).
+_HTTP_POOL_SIZE = int(os.getenv("DATAFORSEO_HTTP_POOL_SIZE", "16"))
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=_HTTP_POOL_SIZE))
+
+
+def close_http_session() -> None:
+    """Release pooled DataForSEO connections (app shutdown)."""
+    _session.close()
+
+
+# Track actual costs from DataForSEO API responses.
+# Thread-local because routes run fetch_keyword_ideas in worker threads.
+_cost_state = threading.local()
 
 
 def clean_location_name(location: str) -> str:
@@ -37,7 +54,7 @@ def clean_location_name(location: str) -> str:
         return location
     
     original_location = location
-    logger.debug(f"clean_location_name input: '{original_location}'")
+    logger.debug("clean_location_name input: '%s'", original_location)
     
     # Map of country codes to full country names
     country_map = {
@@ -82,22 +99,22 @@ def clean_location_name(location: str) -> str:
                 if country_full.lower() in location_name.lower():
                     # Already has country in it, remove any spaces after commas for DataForSEO
                     cleaned = location_name.replace(", ", ",")
-                    logger.debug(f"clean_location_name output: '{cleaned}' (country already in name)")
+                    logger.debug("clean_location_name output: '%s' (country already in name)", cleaned)
                     return cleaned
                 
                 # Check if location_name is the same as country
                 if location_name.lower() == country_full.lower():
                     # Just return country name
-                    logger.debug(f"clean_location_name output: '{country_full}' (country only)")
+                    logger.debug("clean_location_name output: '%s' (country only)", country_full)
                     return country_full
                 else:
                     # Return "City,Country" format for DataForSEO (no space after comma)
                     result = f"{location_name},{country_full}"
-                    logger.debug(f"clean_location_name output: '{result}' (city,country)")
+                    logger.debug("clean_location_name output: '%s' (city,country)", result)
                     return result
     
     # No parentheses - return as-is
-    logger.debug(f"clean_location_name output: '{location}' (no changes)")
+    logger.debug("clean_location_name output: '%s' (no changes)", location)
     return location
 
 
@@ -127,7 +144,7 @@ def post_keywords_for_seed_task(
     if url:
         payload[0]["url"] = url
     
-    resp = requests.post(url_endpoint, json=payload, headers=_auth_header(), timeout=30)
+    resp = _session.post(url_endpoint, json=payload, headers=_auth_header(), timeout=30)
     resp.raise_for_status()
     data = resp.json()
     tasks = (data or {}).get("tasks", [])
@@ -141,7 +158,7 @@ def post_keywords_for_seed_task(
 
 def get_task_result(task_id: str) -> Dict:
     url = f"{API_BASE}/keywords_data/google_ads/keywords_for_keywords/task_get/{task_id}"
-    resp = requests.get(url, headers=_auth_header(), timeout=30)
+    resp = _session.get(url, headers=_auth_header(), timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -189,7 +206,9 @@ def fetch_keyword_ideas(
         return []
     
     # location_name is now the location ID from geo.py (e.g., "1001330" for Auckland)
-    logger.info(f"DataForSEO request: seeds={cleaned_seeds[:3]}..., location_code={location_name}")
+    logger.info("DataForSEO request: seeds=%s..., location_code=%s", cleaned_seeds[:3], location_name)
+
+    _cost_state.total = 0.0
 
     # STEP 1: Get keyword suggestions (up to 20k keywords)
     url_endpoint = f"{API_BASE}/keywords_data/google_ads/keywords_for_keywords/live"
@@ -206,39 +225,39 @@ def fetch_keyword_ideas(
         payload[0]["url"] = url
     
     try:
-        resp = requests.post(url_endpoint, json=payload, headers=_auth_header(), timeout=120)
+        resp = _session.post(url_endpoint, json=payload, headers=_auth_header(), timeout=120)
         resp.raise_for_status()
         data = resp.json()
             
     except requests.exceptions.HTTPError as e:
-        logger.error(f"DataForSEO Step 1 HTTP error: {e.response.status_code} - {e.response.text[:500]}")
+        logger.error("DataForSEO Step 1 HTTP error: %s - %s", e.response.status_code, e.response.text[:500])
         raise RuntimeError(f"DataForSEO Live API failed: HTTP {e.response.status_code}")
     except Exception as e:
-        logger.error(f"DataForSEO Step 1 failed: {str(e)}", exc_info=True)
+        logger.error("DataForSEO Step 1 failed: %s", e, exc_info=True)
         raise RuntimeError(f"DataForSEO Live API failed: {e}")
     
     tasks = data.get("tasks", [])
     if not tasks or not tasks[0].get("result"):
-        logger.warning(f"DataForSEO Step 1 returned no results for location_code={location_name}")
+        logger.warning("DataForSEO Step 1 returned no results for location_code=%s", location_name)
         return []
     
     # Capture actual Step 1 cost
-    global _last_step1_cost
-    _last_step1_cost = tasks[0].get("cost", 0.0)
-    print(f"🔍 Step 1 actual cost from DataForSEO: ${_last_step1_cost:.6f}", flush=True)
+    step1_cost = tasks[0].get("cost", 0.0)
+    _cost_state.total = step1_cost
+    print(f"🔍 Step 1 actual cost from DataForSEO: ${step1_cost:.6f}", flush=True)
     
     # IMPORTANT: result is already an array of keyword items, not a wrapper object with "items"
     # We pay the same $0.075 whether we use 200 or 1000 keywords, so fetch all available keywords
     items = tasks[0]["result"][:1000]  # Limit to top 1000 keywords (same price as 200)
     
-    logger.info(f"DataForSEO Step 1 returned {len(items)} keywords for location_code={location_name}")
+    logger.info("DataForSEO Step 1 returned %s keywords for location_code=%s", len(items), location_name)
     
     # Extract just the keyword strings for Step 2
     keyword_list = [it.get("keyword") for it in items if it.get("keyword")]
     
     if not keyword_list:
-        logger.warning(f"DataForSEO Step 1 returned items but no valid keywords for location_code={location_name}")
-        logger.warning(f"Sample item (if exists): {items[0] if items else 'No items'}")
+        logger.warning("DataForSEO Step 1 returned items but no valid keywords for location_code=%s", location_name)
+        logger.warning("Sample item (if exists): %s", items[0] if items else 'No items')
         return []
     
     # STEP 2: Get full metrics (competition, bids, YoY) using search_volume endpoint
@@ -253,7 +272,7 @@ def fetch_keyword_ideas(
     print(f"🔍 Step 2 payload: keywords={len(keyword_list)}, location_code={int(location_name)}, language={language_name}", flush=True)
     
     try:
-        volume_resp = requests.post(volume_endpoint, json=volume_payload, headers=_auth_header(), timeout=120)
+        volume_resp = _session.post(volume_endpoint, json=volume_payload, headers=_auth_header(), timeout=120)
         volume_resp.raise_for_status()
         volume_data = volume_resp.json()
         
@@ -271,42 +290,37 @@ def fetch_keyword_ideas(
             else:
                 print(f"🔍 Step 2 result is None (error)", flush=True)
             
-        logger.info(f"DataForSEO Step 2 completed: processed {len(keyword_list)} keywords")
+        logger.info("DataForSEO Step 2 completed: processed %s keywords", len(keyword_list))
     except requests.exceptions.HTTPError as e:
-        logger.error(f"DataForSEO Step 2 HTTP error: {e.response.status_code} - {e.response.text[:500]}")
+        logger.error("DataForSEO Step 2 HTTP error: %s - %s", e.response.status_code, e.response.text[:500])
         raise RuntimeError(f"DataForSEO search_volume API failed: HTTP {e.response.status_code}")
     except Exception as e:
-        logger.error(f"DataForSEO Step 2 failed: {str(e)}", exc_info=True)
+        logger.error("DataForSEO Step 2 failed: %s", e, exc_info=True)
         raise RuntimeError(f"DataForSEO search_volume API failed: {e}")
     
     volume_tasks = volume_data.get("tasks", [])
     if not volume_tasks:
-        logger.warning(f"DataForSEO Step 2 returned no tasks")
+        logger.warning("DataForSEO Step 2 returned no tasks")
         return []
     
     # Capture actual Step 2 cost
-    global _last_step2_cost, _last_total_cost
-    _last_step2_cost = volume_tasks[0].get("cost", 0.0)
-    _last_total_cost = _last_step1_cost + _last_step2_cost
-    print(f"🔍 Step 2 actual cost from DataForSEO: ${_last_step2_cost:.6f}", flush=True)
-    print(f"💰 TOTAL COST: Step 1=${_last_step1_cost:.6f} + Step 2=${_last_step2_cost:.6f} = ${_last_total_cost:.6f}", flush=True)
+    step2_cost = volume_tasks[0].get("cost", 0.0)
+    _cost_state.total = step1_cost + step2_cost
+    print(f"🔍 Step 2 actual cost from DataForSEO: ${step2_cost:.6f}", flush=True)
+    print(f"💰 TOTAL COST: Step 1=${step1_cost:.6f} + Step 2=${step2_cost:.6f} = ${_cost_state.total:.6f}", flush=True)
     
     volume_result = volume_tasks[0].get("result")
     if not volume_result:
-        logger.warning(f"DataForSEO Step 2 task has no result")
+        logger.warning("DataForSEO Step 2 task has no result")
         return []
     
     # IMPORTANT: result is already an array of keyword items, not a wrapper object with "items"
     volume_items = volume_result
     if not isinstance(volume_items, list) or len(volume_items) == 0:
-        logger.warning(f"DataForSEO Step 2 returned no items")
+        logger.warning("DataForSEO Step 2 returned no items")
         return []
     
-    logger.info(f"DataForSEO Step 2 returned {len(volume_items)} keywords with full metrics")
-    
-    # Build output with full metrics from search_volume
-    # CRITICAL: Only use exact values from DataForSEO, never make up numbers
-    out: List[Dict] = []
+    logger.info("DataForSEO Step 2 returned %s keywords with full metrics", len(volume_items))
     
     # DEBUG: Log first few items from DataForSEO response
     print(f"\n🔍 DataForSEO Step 2 - First 3 keywords with metrics:")
@@ -322,7 +336,19 @@ def fetch_keyword_ideas(
         if monthly:
             print(f"      latest month volume: {monthly[0].get('search_volume')}")
     
-    for it in volume_items:
+    # Build output with full metrics from search_volume
+    out = list(iter_keyword_metrics(volume_items))
+
+    logger.info("DataForSEO completed: returned %s keywords with metrics", len(out))
+    return out
+
+
+def iter_keyword_metrics(volume_items: Iterable[Dict]) -> Iterator[Dict]:
+    """Yield output rows from DataForSEO search_volume items one at a time.
+    
+    CRITICAL: Only use exact values from DataForSEO, never make up numbers.
+    """
+    for idx, it in enumerate(volume_items):
         kw = it.get("keyword")
         sv = it.get("search_volume")  # May be None
         comp_index = it.get("competition_index")  # May be None
@@ -336,7 +362,7 @@ def fetch_keyword_ideas(
         high_micros = int(round(high_bid * 1_000_000)) if high_bid is not None else None
 
         # DEBUG: Log monthly_searches structure for first 3 keywords
-        if keyword_list.index(kw) < 3:
+        if idx < 3:
             print(f"\n🔍 DEBUG: Keyword '{kw}'")
             print(f"   monthly_searches length: {len(monthly_searches)}")
             if monthly_searches:
@@ -387,7 +413,7 @@ def fetch_keyword_ideas(
             except (IndexError, KeyError, ZeroDivisionError):
                 print(f"   YoY: Cannot calculate from 12 months of data")
 
-        out.append({
+        yield {
             "keyword": kw,
             "avg_monthly_searches": sv,  # None if DataForSEO didn't provide
             "competition": comp_str,  # None if DataForSEO didn't provide
@@ -396,22 +422,39 @@ def fetch_keyword_ideas(
             "high_top_of_page_bid_micros": high_micros,  # None if DataForSEO didn't provide
             "yoy_change": yoy_change,  # None if not enough data
             "monthly_searches": monthly_searches if monthly_searches is not None else [],  # Always an array, never None
-        })
-
-    logger.info(f"DataForSEO completed: returned {len(out)} keywords with metrics")
-    return out
+        }
 
 
 def get_dataforseo_cost() -> float:
     """Return the actual cost of the last DataForSEO request.
     
     DataForSEO returns the actual cost in each task response.
-    This function returns the combined cost from the last fetch_keyword_ideas call.
+    This function returns the combined cost from the last fetch_keyword_ideas call
+    made on the current thread.
     
     Returns:
         Actual cost in USD from the last DataForSEO request (or $0.00 if not run yet)
     """
-    return _last_total_cost
+    return getattr(_cost_state, "total", 0.0)
+
+
+# Precompiled character/year checks for filter_keywords_by_intake
+# Non-ASCII characters other than whitespace
+_FOREIGN_CHAR_RE = re.compile(r"[^\x00-\x7f\s]")
+# Anything except letters, digits, whitespace, hyphens and apostrophes
+_SPECIAL_CHAR_RE = re.compile(r"[^A-Za-z0-9\s'-]")
+# 4-digit numbers that look like years (1900-2099)
+_YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+
+@lru_cache(maxsize=256)
+def _substring_pattern(terms: tuple) -> "re.Pattern":
+    """One regex that matches if any of the terms occurs as a substring.
+
+    A single alternation scans each keyword once in C instead of
+    looping over every term in Python.
+    """
+    return re.compile("|".join(map(re.escape, terms)))
 
 
 def filter_keywords_by_intake(
@@ -454,7 +497,7 @@ def filter_keywords_by_intake(
     
     low_volume_removed = original_count - len(filtered)
     if low_volume_removed > 0:
-        logger.info(f"Filtered by search volume: removed {low_volume_removed} keywords with volume < 10")
+        logger.info("Filtered by search volume: removed %s keywords with volume < 10", low_volume_removed)
         print(f"🔍 Search volume filter: removed {low_volume_removed} keywords (volume < 10)")
     
     # Step 1.5: Filter out single-word keywords (too generic)
@@ -465,18 +508,18 @@ def filter_keywords_by_intake(
     ]
     single_word_removed = before_single_word - len(filtered)
     if single_word_removed > 0:
-        logger.info(f"Filtered single-word keywords: removed {single_word_removed} keywords")
+        logger.info("Filtered single-word keywords: removed %s keywords", single_word_removed)
         print(f"🔍 Single-word keywords filter: removed {single_word_removed} keywords (too generic)")
     
     # Step 1.6: Filter out keywords with non-ASCII/foreign characters
     before_foreign = len(filtered)
     filtered = [
         kw for kw in filtered
-        if all(ord(char) < 128 or char.isspace() or char in "'-" for char in kw.get("keyword", ""))
+        if not _FOREIGN_CHAR_RE.search(kw.get("keyword", ""))
     ]
     foreign_removed = before_foreign - len(filtered)
     if foreign_removed > 0:
-        logger.info(f"Filtered foreign language keywords: removed {foreign_removed} keywords")
+        logger.info("Filtered foreign language keywords: removed %s keywords", foreign_removed)
         print(f"🔍 Foreign language filter: removed {foreign_removed} keywords (non-ASCII characters)")
     
     # Step 1.7: Filter out keywords with duplicate/repeated words
@@ -493,7 +536,7 @@ def filter_keywords_by_intake(
     filtered = filtered_no_dupes
     duplicate_removed = before_duplicates - len(filtered)
     if duplicate_removed > 0:
-        logger.info(f"Filtered duplicate word keywords: removed {duplicate_removed} keywords")
+        logger.info("Filtered duplicate word keywords: removed %s keywords", duplicate_removed)
         print(f"🔍 Duplicate words filter: removed {duplicate_removed} keywords (e.g., 'seo services seo')")
     
     # Step 1.8: Filter out keywords with special symbols
@@ -501,17 +544,14 @@ def filter_keywords_by_intake(
     # Allow only alphanumeric, spaces, hyphens, and apostrophes
     filtered = [
         kw for kw in filtered
-        if all(char.isalnum() or char.isspace() or char in "-'" for char in kw.get("keyword", ""))
+        if not _SPECIAL_CHAR_RE.search(kw.get("keyword", ""))
     ]
     special_removed = before_special - len(filtered)
     if special_removed > 0:
-        logger.info(f"Filtered special symbols keywords: removed {special_removed} keywords")
+        logger.info("Filtered special symbols keywords: removed %s keywords", special_removed)
         print(f"🔍 Special symbols filter: removed {special_removed} keywords (e.g., '[seo]', 'services%', etc.)")
     
     # Step 1.9: Filter out keywords with past dates (earlier than current year)
-    import re
-    from datetime import datetime
-    
     before_dates = len(filtered)
     current_year = datetime.now().year
     filtered_no_dates = []
@@ -519,7 +559,7 @@ def filter_keywords_by_intake(
     for kw_obj in filtered:
         keyword_text = kw_obj.get("keyword", "").strip()
         # Find all 4-digit numbers that look like years (1900-2099)
-        years = re.findall(r'\b(19\d{2}|20\d{2})\b', keyword_text)
+        years = _YEAR_RE.findall(keyword_text)
         
         # Check if any year is from the past (before current year)
         has_past_date = any(int(year) < current_year for year in years)
@@ -530,7 +570,7 @@ def filter_keywords_by_intake(
     filtered = filtered_no_dates
     dates_removed = before_dates - len(filtered)
     if dates_removed > 0:
-        logger.info(f"Filtered past date keywords: removed {dates_removed} keywords")
+        logger.info("Filtered past date keywords: removed %s keywords", dates_removed)
         print(f"🔍 Past dates filter: removed {dates_removed} keywords (e.g., 'seo for 2024', 'best 2023 practices', etc.)")
     
     # Step 2: Filter by negative keywords
@@ -544,13 +584,14 @@ def filter_keywords_by_intake(
     
     if negative_list:
         before_negative = len(filtered)
+        negative_re = _substring_pattern(tuple(negative_list))
         filtered = [
             kw for kw in filtered
-            if not any(neg in kw.get("keyword", "").lower() for neg in negative_list)
+            if not negative_re.search(kw.get("keyword", "").lower())
         ]
         removed = before_negative - len(filtered)
         if removed > 0:
-            logger.info(f"Filtered by negative keywords: removed {removed} keywords")
+            logger.info("Filtered by negative keywords: removed %s keywords", removed)
             print(f"🔍 Negative keywords filter: removed {removed} keywords (including 'near me', 'nearby', etc.)")
     
     # Step 3: Filter by excluded brands
@@ -560,13 +601,14 @@ def filter_keywords_by_intake(
     
     if excluded_list:
         before_brands = len(filtered)
+        brands_re = _substring_pattern(tuple(excluded_list))
         filtered = [
             kw for kw in filtered
-            if not any(brand in kw.get("keyword", "").lower() for brand in excluded_list)
+            if not brands_re.search(kw.get("keyword", "").lower())
         ]
         removed = before_brands - len(filtered)
         if removed > 0:
-            logger.info(f"Filtered by excluded brands: removed {removed} keywords")
+            logger.info("Filtered by excluded brands: removed %s keywords", removed)
             print(f"🔍 Excluded brands filter: removed {removed} keywords")
     
     # Step 4: Filter by location relevance and exclude irrelevant countries
@@ -603,14 +645,15 @@ def filter_keywords_by_intake(
         before_location = len(filtered)
         # Build list of other locations to exclude (all common locations except target)
         other_locations = common_locations - {target_location_main}
+        other_locations_re = _substring_pattern(tuple(sorted(other_locations)))
         
         filtered = [
             kw for kw in filtered
-            if not any(loc in kw.get("keyword", "").lower() for loc in other_locations)
+            if not other_locations_re.search(kw.get("keyword", "").lower())
         ]
         removed = before_location - len(filtered)
         if removed > 0:
-            logger.info(f"Filtered by location relevance: removed {removed} keywords with irrelevant locations")
+            logger.info("Filtered by location relevance: removed %s keywords with irrelevant locations", removed)
             print(f"🔍 Location filter: removed {removed} keywords with irrelevant locations (target: {target_location_main})")
     
     # Step 4.1: Filter by irrelevant countries
@@ -643,13 +686,14 @@ def filter_keywords_by_intake(
     }
     
     before_countries = len(filtered)
+    excluded_countries_re = _substring_pattern(tuple(sorted(excluded_countries)))
     filtered = [
         kw for kw in filtered
-        if not any(country in kw.get("keyword", "").lower() for country in excluded_countries)
+        if not excluded_countries_re.search(kw.get("keyword", "").lower())
     ]
     countries_removed = before_countries - len(filtered)
     if countries_removed > 0:
-        logger.info(f"Filtered by irrelevant countries: removed {countries_removed} keywords")
+        logger.info("Filtered by irrelevant countries: removed %s keywords", countries_removed)
         print(f"🔍 Irrelevant countries filter: removed {countries_removed} keywords (France, Germany, China, Japan, etc.)")
     
     total_removed = original_count - len(filtered)
@@ -681,7 +725,7 @@ def fetch_locations() -> List[Dict]:
     
     # Stream the response to avoid loading entire payload into memory at once
     try:
-        resp = requests.get(url, headers=_auth_header(), timeout=60, stream=True)
+        resp = _session.get(url, headers=_auth_header(), timeout=60, stream=True)
         resp.raise_for_status()
         
         # Parse JSON incrementally
@@ -1,7 +1,9 @@
 import os
 import json
+import itertools
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.cloud import firestore as gcfirestore
 
 
 def init_firestore():
@@ -46,5 +48,35 @@ def init_firestore():
     )
 
 
-# Initialize Firestore on import
-db = init_firestore()
\ No newline at end of file
+def _init_client_pool(primary, size: int) -> list:
+    """Extra Firestore clients sharing the app's credentials.
+
+    Each client has its own gRPC channel, so concurrent requests spread
+    across several connections instead of queueing behind one.
+    """
+    if size <= 1:
+        return [primary]
+    app = firebase_admin.get_app()
+    return [primary] + [
+        gcfirestore.Client(project=primary.project, credentials=app.credential.get_credential())
+        for _ in range(size - 1)
+    ]
+
+
+# Initialize Firestore on import. db is the first pool member; modules that
+# don't take a client per request use it for all of their reads and writes.
+db = init_firestore()
+
+_client_pool = _init_client_pool(db, int(os.getenv("FIRESTORE_CLIENT_POOL_SIZE", "4")))
+_client_cycle = itertools.cycle(_client_pool)
+
+
+def get_db():
+    """Firestore client for one request, round-robin over the client pool.
+
+    Take one client per request or job and build every reference, batch and
+    transaction for that work from it: a batch or transaction only commits
+    writes made through its own client. Helpers that write references they
+    were handed take the caller's client as a parameter.
+    """
+    return next(_client_cycle)
@@ -0,0 +1,63 @@
+import os
+import asyncio
+import logging
+import sqlite3
+from functools import lru_cache
+from typing import Optional
+
+from app.services.dataforseo import clean_location_name
+
+logger = logging.getLogger(__name__)
+
+# Same SQLite database served by the /geo routes
+DB_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "locations.db")
+
+
+def _candidate_names(location: str) -> list[str]:
+    """Name variants worth trying for a raw intake location string.
+
+    "Auckland (City · NZ)" -> ["Auckland (City · NZ)", "Auckland,New Zealand", "Auckland, New Zealand"]
+    """
+    cleaned = clean_location_name(location)
+    return list(dict.fromkeys([location, cleaned, cleaned.replace(",", ", ")]))
+
+
+@lru_cache(maxsize=2048)
+def _lookup_location_code(location: str) -> Optional[str]:
+    """Blocking SQLite lookup; cached because locations.db is read-only."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        # Stops at the first matching row; later candidates are never queried
+        return next(
+            (
+                str(row[0])
+                for name in _candidate_names(location)
+                for row in conn.execute(
+                    "SELECT location_code FROM locations WHERE location_name = ? COLLATE NOCASE LIMIT 1",
+                    (name,),
+                )
+            ),
+            None,
+        )
+    finally:
+        conn.close()
+
+
+async def resolve_geo_id(location: str) -> Optional[str]:
+    """Resolve an intake location to a DataForSEO location code.
+
+    Returns the location code as a string, or None when the location
+    cannot be matched against locations.db.
+    """
+    location = (location or "").strip()
+    if not location:
+        return None
+
+    # Intakes created from the /geo picker already store the location code
+    if location.isdigit():
+        return location
+
+    geo_id = await asyncio.to_thread(_lookup_location_code, location)
+    if geo_id is None:
+        logger.warning("Could not resolve location '%s' to a location code", location)
+    return geo_id
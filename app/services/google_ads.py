@@ -1,9 +1,14 @@
 import os
+from functools import lru_cache
 
 
+@lru_cache(maxsize=1)
 def load_google_ads_client():
     """Initialize Google Ads client using environment variables.
 
+    Memoized so the process reuses one client (and its credentials) instead of
+    rebuilding it on every call.
+
     Raises:
         ValueError: if required environment variables are missing.
     Returns:
@@ -42,6 +47,17 @@ def load_google_ads_client():
     return client, customer_id
 
 
+@lru_cache(maxsize=1)
+def _get_keyword_plan_idea_service():
+    """Return a long-lived KeywordPlanIdeaService.
+
+    get_service() opens a new gRPC channel each time; caching the service keeps
+    a single keepalive HTTP/2 connection per worker.
+    """
+    client, _ = load_google_ads_client()
+    return client.get_service("KeywordPlanIdeaService")
+
+
 def fetch_keyword_ideas(
     seed_keywords: list[str] = None,
     geo_id: int = 2840,
@@ -68,7 +84,7 @@ def fetch_keyword_ideas(
     if not customer_id:
         raise ValueError("GOOGLE_ADS_CUSTOMER_ID missing.")
 
-    service = client.get_service("KeywordPlanIdeaService")
+    service = _get_keyword_plan_idea_service()
     request = client.get_type("GenerateKeywordIdeasRequest")
     request.customer_id = customer_id
 
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 import time
 from app.services.firestore import db
+from app.services import stats_counter
 from google.cloud import firestore as gcfirestore
 from app.utils.cost_calculator import calculate_openai_cost
 from app.utils.currency import get_currency_for_location, format_bid
@@ -92,7 +93,8 @@ def run_keyword_ai_filter(
     - Injects intake and raw_output JSON blocks
     - Calls OpenAI chat completions with JSON response_format
     - Parses JSON safely
-    - Saves structured results to Firestore under research/{userId}/{researchId}
+    - Saves structured results to Firestore under research/{userId}/{researchId};
+      callers write intakes/{userId}/{researchId}/keyword_research themselves
 
     Returns the parsed JSON structure.
     """
@@ -414,50 +416,18 @@ def run_keyword_ai_filter(
     try:
         user_ref = db.collection("users").document(user_id)
         
-        # First, ensure fields exist (set with merge to avoid overwriting)
+        # Increment treats missing fields as 0 and merge=True creates a missing
+        # document, so one write covers new and existing users
         user_ref.set({
-            "tokenUsage": 0,
-            "totalSpend": 0.0
-        }, merge=True)
-        
-        # Now increment
-        user_ref.update({
             "tokenUsage": gcfirestore.Increment(token_usage["total_tokens"]),
             "totalSpend": gcfirestore.Increment(cost),
             "lastActivity": gcfirestore.SERVER_TIMESTAMP,
-        })
+        }, merge=True)
     except Exception as e:
         pass  # Silently fail - metrics are non-critical
     
     # Update public stats counter for keywords analyzed
-    try:
-        total_keywords = len(payload["primary_keywords"]) + len(payload["secondary_keywords"]) + len(payload["long_tail_keywords"])
-        db.collection("system").document("stats").update({
-            "keywords_analyzed": gcfirestore.Increment(total_keywords)
-        })
-    except Exception:
-        pass  # Non-critical
-
-    # Mirror structured keywords back into intake path for legacy UI compatibility
-    try:
-        intake_keywords_ref = (
-            db.collection("intakes")
-            .document(user_id)
-            .collection(research_id)
-            .document("keyword_research")
-        )
-        intake_keywords_ref.set(
-            {
-                "primary_keywords": payload["primary_keywords"],
-                "secondary_keywords": payload["secondary_keywords"],
-                "long_tail_keywords": payload["long_tail_keywords"],
-                "status": payload["status"],
-                "updatedAt": gcfirestore.SERVER_TIMESTAMP,
-            },
-            merge=True,
-        )
-    except Exception:
-        # Best-effort; do not fail the main pipeline if legacy mirroring fails
-        pass
+    total_keywords = len(payload["primary_keywords"]) + len(payload["secondary_keywords"]) + len(payload["long_tail_keywords"])
+    stats_counter.increment("keywords_analyzed", total_keywords)
 
     return payload
@@ -0,0 +1,97 @@
+"""
+Storage helpers for raw DataForSEO keyword data.
+
+The full raw keyword list is stored in fixed-size chunks under
+intakes/{userId}/{intakeId}/keyword_research/raw_chunks so the root
+keyword_research document stays small and no single document gets near
+Firestore's 1 MiB limit. Each chunk holds RAW_CHUNK_SIZE keywords as a
+gzip-compressed JSON blob; the blob field is exempt from indexing (see
+firestore.indexes.json).
+
+Older documents keep raw keywords inline in a raw_output field, which is
+still read.
+"""
+
+import base64
+import gzip
+from itertools import islice
+from typing import Dict, Iterable, List
+
+import orjson
+
+
+RAW_CHUNKS_COLLECTION = "raw_chunks"
+RAW_CHUNK_SIZE = 500
+# A WriteBatch takes at most 500 writes
+_MAX_BATCH_WRITES = 500
+
+
+def _chunk_id(index: int) -> str:
+    # Zero-padded so document IDs sort in the original order
+    return f"{index:05d}"
+
+
+def encode_raw_output(raw_output: List[Dict]) -> str:
+    return base64.b64encode(gzip.compress(orjson.dumps(raw_output))).decode()
+
+
+def decode_raw_output(blob: str) -> List[Dict]:
+    return orjson.loads(gzip.decompress(base64.b64decode(blob)))
+
+
+def save_raw_output(research_ref, raw_output: Iterable[Dict], *, client) -> int:
+    """Write raw keywords in compressed chunks. Returns the number written.
+
+    Accepts any iterable; only one chunk is held in memory at a time.
+    client must be the Firestore client research_ref was built from.
+    """
+    chunks_ref = research_ref.collection(RAW_CHUNKS_COLLECTION)
+    rows = iter(raw_output)
+    batch = client.batch()
+    pending = 0
+    count = 0
+    index = 0
+    while chunk := list(islice(rows, RAW_CHUNK_SIZE)):
+        batch.set(chunks_ref.document(_chunk_id(index)), {
+            "count": len(chunk),
+            "data": encode_raw_output(chunk),
+        })
+        count += len(chunk)
+        index += 1
+        pending += 1
+        if pending == _MAX_BATCH_WRITES:
+            batch.commit()
+            batch = client.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    return count
+
+
+def load_raw_output(research_ref, data: Dict) -> List[Dict]:
+    """Read raw keywords for a keyword_research document.
+
+    Falls back to the inline raw_output field for older documents.
+    """
+    if "raw_output" in data:
+        return data.get("raw_output") or []
+
+    raw_count = data.get("raw_count", 0)
+    if not raw_count:
+        return []
+
+    # Chunks beyond raw_count may be left over from a longer previous run
+    chunk_limit = -(-raw_count // RAW_CHUNK_SIZE)
+    query = research_ref.collection(RAW_CHUNKS_COLLECTION).order_by("__name__").limit(chunk_limit)
+    raw_output: List[Dict] = []
+    for doc in query.stream():
+        raw_output.extend(decode_raw_output(doc.get("data")))
+    return raw_output[:raw_count]
+
+
+def delete_keyword_research(research_ref, *, client) -> None:
+    """Delete a keyword_research document together with its raw data.
+
+    client must be the Firestore client research_ref was built from.
+    """
+    client.recursive_delete(research_ref)
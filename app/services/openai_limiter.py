@@ -0,0 +1,33 @@
+import os
+import logging
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Per-process budgets; keep them at or below the account's OpenAI limits
+# divided by the number of workers. Set either to 0 to disable it.
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+
+_rpm_bucket = TokenBucket(capacity=OPENAI_RPM_LIMIT, period=60, maxsize=1) if OPENAI_RPM_LIMIT > 0 else None
+_tpm_bucket = TokenBucket(capacity=OPENAI_TPM_LIMIT, period=60, maxsize=1) if OPENAI_TPM_LIMIT > 0 else None
+
+
+def estimate_tokens(messages: list) -> int:
+    """Rough prompt token count (~4 characters per token)."""
+    return sum(len(m.get("content") or "") for m in messages) // 4
+
+
+def acquire(messages: list) -> None:
+    """Wait for room in the request and token budgets before an OpenAI call.
+
+    Generators call this from worker threads, so blocking here never stalls
+    the event loop.
+    """
+    waited = 0.0
+    if _rpm_bucket:
+        waited += _rpm_bucket.acquire("openai")
+    if _tpm_bucket:
+        waited += _tpm_bucket.acquire("openai", estimate_tokens(messages))
+    if waited:
+        logger.info("OpenAI limiter delayed request by %.2fs", waited)
@@ -0,0 +1,86 @@
+import os
+import logging
+import threading
+from collections import Counter
+from google.cloud import firestore as gcfirestore
+from app.services.firestore import get_db
+
+logger = logging.getLogger(__name__)
+
+# system/stats is one hot document; Firestore sustains about one write per
+# second on it. Increments are summed in memory and written together.
+STATS_FLUSH_INTERVAL_SECONDS = float(os.getenv("STATS_FLUSH_INTERVAL_SECONDS", "5"))
+# Flush early once this many increments are pending
+STATS_FLUSH_MAX_EVENTS = 100
+
+_pending: Counter = Counter()
+_pending_events = 0
+_lock = threading.Lock()
+_wake = threading.Event()
+_stop = threading.Event()
+_flusher: threading.Thread | None = None
+
+
+def increment(field: str, amount: int = 1) -> None:
+    """Queue an Increment on a system/stats counter."""
+    global _pending_events
+    if not amount:
+        return
+    with _lock:
+        _pending[field] += amount
+        _pending_events += 1
+        full = _pending_events >= STATS_FLUSH_MAX_EVENTS
+    if _flusher is None:
+        # No background flusher (e.g. scripts): write straight away
+        flush()
+    elif full:
+        _wake.set()
+
+
+def flush() -> None:
+    """Write all pending increments to system/stats in one update."""
+    global _pending_events
+    with _lock:
+        if not _pending:
+            return
+        snapshot = dict(_pending)
+        _pending.clear()
+        _pending_events = 0
+    try:
+        # merge=True creates system/stats if it does not exist yet
+        get_db().collection("system").document("stats").set(
+            {field: gcfirestore.Increment(amount) for field, amount in snapshot.items()},
+            merge=True,
+        )
+    except Exception as e:
+        logger.warning("Stats flush failed, keeping %d counters for the next one: %s", len(snapshot), e)
+        with _lock:
+            _pending.update(snapshot)
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        _wake.wait(STATS_FLUSH_INTERVAL_SECONDS)
+        _wake.clear()
+        flush()
+
+
+def start_stats_flusher() -> None:
+    """Start the background thread that flushes pending increments."""
+    global _flusher
+    if _flusher is not None:
+        return
+    _stop.clear()
+    _flusher = threading.Thread(target=_run, name="stats-flusher", daemon=True)
+    _flusher.start()
+
+
+def stop_stats_flusher() -> None:
+    """Stop the flusher and write whatever is still pending."""
+    global _flusher
+    if _flusher is not None:
+        _stop.set()
+        _wake.set()
+        _flusher.join(timeout=STATS_FLUSH_INTERVAL_SECONDS)
+        _flusher = None
+    flush()
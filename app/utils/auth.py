@@ -1,4 +1,10 @@
+import time
+import asyncio
+import hashlib
+import threading
+from cachetools import TTLCache
 from fastapi import APIRouter, Header, HTTPException, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import auth as firebase_auth
 
 from app.services.firestore import db
@@ -6,6 +12,74 @@ from google.cloud import firestore as gcfirestore
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# Decoded ID tokens keyed by a hash of the raw token.
+# Firebase ID tokens live for at most an hour, which bounds the TTL.
+_token_cache: TTLCache = TTLCache(maxsize=50_000, ttl=3600)
+# TTLCache is not thread-safe and routes verify tokens from worker threads
+_token_cache_lock = threading.Lock()
+# Treat tokens this close to expiry as expired so a cached result is never stale
+_TOKEN_EXPIRY_SKEW_SECONDS = 30
+
+# users/{uid}.role by uid. Roles change rarely, and the admin role endpoints
+# invalidate entries on change; the TTL bounds staleness across workers.
+_role_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_role_cache_lock = threading.Lock()
+_MISSING = object()
+
+
+def bearer_token(authorization: str | None, detail: str = "Missing or invalid Authorization header") -> str:
+    """Token from an "Authorization: Bearer <token>" header.
+
+    Raises 401 with `detail` when the header is missing, uses another scheme
+    or carries no token.
+    """
+    if not authorization or len(authorization) < 8 or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail=detail)
+    return authorization[7:]  # len("Bearer ") == 7
+
+
+def verify_id_token_cached(token: str) -> dict:
+    """Verify a Firebase ID token, reusing the decoded claims until the token expires.
+
+    Raises the same exceptions as firebase_auth.verify_id_token on a cache miss.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None and time.time() + _TOKEN_EXPIRY_SKEW_SECONDS < cached[0]:
+        return cached[1]
+
+    # Verify outside the lock; concurrent misses for one token are harmless
+    decoded = firebase_auth.verify_id_token(token)
+    with _token_cache_lock:
+        _token_cache[key] = (decoded["exp"], decoded)
+    return decoded
+
+
+def get_user_role_cached(user_ref) -> str | None:
+    """Role stored on a users/{uid} document, cached per uid for a few minutes.
+
+    Returns None when the user document does not exist or has no role.
+    Blocking on a cache miss; call from a worker thread in async routes.
+    """
+    with _role_cache_lock:
+        role = _role_cache.get(user_ref.id, _MISSING)
+    if role is not _MISSING:
+        return role
+
+    doc = user_ref.get()
+    role = (doc.to_dict() or {}).get("role") if doc.exists else None
+    with _role_cache_lock:
+        _role_cache[user_ref.id] = role
+    return role
+
+
+def invalidate_role_cache(uid: str) -> None:
+    """Drop a cached role after it changes in Firestore."""
+    with _role_cache_lock:
+        _role_cache.pop(uid, None)
+
+
 def verify_token(authorization: str = Header(None)) -> dict:
     """FastAPI dependency to verify Firebase ID token.
 
@@ -16,13 +90,34 @@ def verify_token(authorization: str = Header(None)) -> dict:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
 
     try:
-        token = authorization.replace("Bearer ", "")
-        decoded = firebase_auth.verify_id_token(token)
+        token = bearer_token(authorization)
+        decoded = verify_id_token_cached(token)
         return decoded
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
+# auto_error=False so a missing header gets the same 401 detail as verify_token
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def verify_bearer_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
+) -> dict:
+    """Async FastAPI dependency to verify a Firebase ID token from a Bearer header.
+
+    Same result as verify_token, but verification runs in a worker thread and
+    the Bearer scheme is declared in the OpenAPI schema.
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+
+    try:
+        return await asyncio.to_thread(verify_id_token_cached, credentials.credentials)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
 def require_admin(authorization: str = Header(None)) -> dict:
     """FastAPI dependency to verify Firebase ID token AND enforce admin role.
     
@@ -34,8 +129,8 @@ def require_admin(authorization: str = Header(None)) -> dict:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
     
     try:
-        token = authorization.replace("Bearer ", "")
-        decoded = firebase_auth.verify_id_token(token)
+        token = bearer_token(authorization)
+        decoded = verify_id_token_cached(token)
         uid = decoded.get("uid")
         
         # Check admin role in Firestore
@@ -28,18 +28,24 @@ GPT35_TURBO_PRICING = {
 }
 
 
+MODEL_PRICING = {
+    "gpt-4o-mini": GPT4O_MINI_PRICING,
+    "gpt-4o": GPT4O_PRICING,
+    "gpt-4-turbo": GPT4_TURBO_PRICING,
+    "gpt-3.5-turbo": GPT35_TURBO_PRICING,
+}
+
+# (prompt, completion) USD per token, built once; unknown models bill as gpt-4o-mini
+_PER_TOKEN_RATES = {
+    model: (pricing["prompt"] / 1_000_000, pricing["completion"] / 1_000_000)
+    for model, pricing in MODEL_PRICING.items()
+}
+_DEFAULT_RATES = _PER_TOKEN_RATES["gpt-4o-mini"]
+
+
 def get_model_pricing(model: str = "gpt-4o-mini") -> dict:
     """Get pricing for a specific model."""
-    if model == "gpt-4o-mini":
-        return GPT4O_MINI_PRICING
-    elif model == "gpt-4o":
-        return GPT4O_PRICING
-    elif model == "gpt-4-turbo":
-        return GPT4_TURBO_PRICING
-    elif model == "gpt-3.5-turbo":
-        return GPT35_TURBO_PRICING
-    else:
-        return GPT4O_MINI_PRICING
+    return MODEL_PRICING.get(model, GPT4O_MINI_PRICING)
 
 
 def get_cost_per_1k_tokens(model: str = "gpt-4o-mini") -> str:
@@ -75,13 +81,9 @@ def calculate_openai_cost(
         Cost in USD (as float)
     """
     
-    pricing = get_model_pricing(model)
-    
-    # Calculate cost (convert from per-million to actual cost)
-    prompt_cost = (prompt_tokens / 1_000_000) * pricing["prompt"]
-    completion_cost = (completion_tokens / 1_000_000) * pricing["completion"]
+    prompt_rate, completion_rate = _PER_TOKEN_RATES.get(model, _DEFAULT_RATES)
     
-    total_cost = prompt_cost + completion_cost
+    total_cost = prompt_tokens * prompt_rate + completion_tokens * completion_rate
     
     return round(total_cost, 6)  # Round to 6 decimal places ($0.000001)
 
@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+from cachetools import TTLCache
+from fastapi import HTTPException, Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+
+def rate_limit_key(request: Request) -> str:
+    """Rate limit per authenticated user, falling back to client IP.
+
+    The uid is set on request.state by the route's auth dependency, so only
+    limited routes pay for token verification.
+    """
+    uid = getattr(request.state, "uid", None)
+    if uid:
+        return f"uid:{uid}"
+    return get_remote_address(request)
+
+
+# Shared limiter for the whole app.
+# Set RATE_LIMIT_STORAGE_URI (e.g. redis://host:6379/0) so every worker shares
+# the same counters; the in-memory default is per process.
+# headers_enabled adds X-RateLimit-* headers and Retry-After on 429, which
+# requires decorated routes to accept a `response: Response` parameter.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "memory://"),
+    headers_enabled=True,
+)
+
+
+class TokenBucket:
+    """In-process token bucket per key (e.g. uid).
+
+    Allows bursts up to `capacity` and refills at `capacity` tokens per
+    `period` seconds. Idle buckets expire once they would be full again,
+    which keeps memory bounded without changing behaviour.
+    """
+
+    def __init__(self, capacity: int, period: float, maxsize: int = 10_000):
+        self.capacity = float(capacity)
+        self.rate = capacity / period  # tokens per second
+        self._buckets: TTLCache = TTLCache(maxsize=maxsize, ttl=period)
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, amount: float = 1) -> float:
+        """Take `amount` tokens for key. Returns 0 on success, else seconds until they are free."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens < amount:
+                self._buckets[key] = (tokens, now)
+                return (amount - tokens) / self.rate
+            self._buckets[key] = (tokens - amount, now)
+            return 0.0
+
+    def acquire(self, key: str, amount: float = 1) -> float:
+        """Block until `amount` tokens are taken for key. Returns seconds waited.
+
+        For worker threads only. Amounts above capacity wait for a full bucket.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while (wait := self.consume(key, amount)):
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    def check(self, key: str) -> None:
+        """Consume a token or raise 429 with Retry-After."""
+        retry_after = self.consume(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded, please retry later",
+                headers={"Retry-After": str(int(retry_after) + 1)},
+            )
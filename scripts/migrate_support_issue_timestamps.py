@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+One-off backfill: convert ISO-string createdAt/updatedAt on support_issues
+to native Firestore timestamps.
+
+New issues are written with SERVER_TIMESTAMP. Firestore orders strings after
+timestamps, so /my-issues only sorts correctly once every issue uses the
+native type. Run this once before deploying the SERVER_TIMESTAMP change.
+
+Usage: python scripts/migrate_support_issue_timestamps.py [--dry-run]
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.firestore import db  # noqa: E402
+
+TIMESTAMP_FIELDS = ("createdAt", "updatedAt")
+# Firestore caps a batch at 500 writes
+BATCH_SIZE = 500
+
+
+def parse_iso(value: str) -> datetime:
+    """Parse a stored ISO string; the old writes used naive UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def migrate(dry_run: bool = False) -> int:
+    """Rewrite string timestamps in place. Returns the number of issues updated."""
+    batch = db.batch()
+    pending = 0
+    updated = 0
+
+    for doc in db.collection("support_issues").select(list(TIMESTAMP_FIELDS)).stream():
+        data = doc.to_dict() or {}
+        changes = {}
+        for field in TIMESTAMP_FIELDS:
+            value = data.get(field)
+            if not isinstance(value, str):
+                continue
+            try:
+                changes[field] = parse_iso(value)
+            except ValueError:
+                print(f"Skipping {doc.id}: unparseable {field} {value!r}")
+        if not changes:
+            continue
+
+        updated += 1
+        if dry_run:
+            continue
+        batch.update(doc.reference, changes)
+        pending += 1
+        if pending == BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        batch.commit()
+    return updated
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv[1:]
+    count = migrate(dry_run=dry_run)
+    verb = "Would update" if dry_run else "Updated"
+    print(f"{verb} {count} support issue(s)")
+
+
+if __name__ == "__main__":
+    main()